@@ -1,16 +1,118 @@
 from django.contrib import admin
+from django.template.defaultfilters import filesizeformat
 
 from .models import SavedReport
 
 
+class FileSizeListFilter(admin.SimpleListFilter):
+    """
+    Filter saved reports by the stored size of their file
+    """
+
+    title = "file size"
+    parameter_name = "file_size"
+
+    # (value, label, lower bound, upper bound) in bytes
+    buckets = (
+        ("small", "Under 1 MB", None, 1024 ** 2),
+        ("medium", "1 MB to 100 MB", 1024 ** 2, 100 * 1024 ** 2),
+        ("large", "Over 100 MB", 100 * 1024 ** 2, None),
+    )
+
+    def lookups(self, request, model_admin):
+        return [(value, label) for value, label, lower, upper in self.buckets]
+
+    def queryset(self, request, queryset):
+        for value, label, lower, upper in self.buckets:
+            if self.value() == value:
+                if lower is not None:
+                    queryset = queryset.filter(file_size__gte=lower)
+                if upper is not None:
+                    queryset = queryset.filter(file_size__lt=upper)
+        return queryset
+
+
+class ContentTypeListFilter(admin.SimpleListFilter):
+    """
+    Filter saved reports by the type of their file. The choices are fixed,
+    rather than the distinct values of the column, which would take a scan of
+    the whole table on every changelist.
+    """
+
+    title = "content type"
+    parameter_name = "content_type"
+
+    # (value, label, content types); "other" is anything else
+    types = (
+        ("csv", "CSV", ("text/csv",)),
+        ("xml", "XML", ("application/xml", "text/xml")),
+    )
+
+    def lookups(self, request, model_admin):
+        lookups = [(value, label) for value, label, content_types in self.types]
+        return lookups + [("other", "Other")]
+
+    def queryset(self, request, queryset):
+        if self.value() == "other":
+            known = [ct for value, label, cts in self.types for ct in cts]
+            return queryset.exclude(content_type__in=known)
+        for value, label, content_types in self.types:
+            if self.value() == value:
+                return queryset.filter(content_type__in=content_types)
+        return queryset
+
+
 class SavedReportAdmin(admin.ModelAdmin):
     list_display = (
         "report",
         "date_created",
         "run_by",
+        "rows_processed",
+        "size",
+        "content_type",
+        "progress",
+        "eta",
     )
+    # Display and filtering only use the file details stored on the row, so
+    # the changelist never goes to storage.
+    list_filter = ("date_created", ContentTypeListFilter, FileSizeListFilter)
+    list_select_related = ("run_by",)
     raw_id_fields = ("run_by",)
-    readonly_fields = ("run_by", "report")
+    readonly_fields = (
+        "run_by",
+        "report",
+        "file_size",
+        "content_type",
+        "checksum",
+        "rows_processed",
+        "rows_total",
+        "rows_per_second",
+        "progress",
+        "eta",
+        "date_completed",
+        "profile_summary",
+    )
+
+    def size(self, obj):
+        if obj.file_size is None:
+            return "-"
+        return filesizeformat(obj.file_size)
+
+    size.admin_order_field = "file_size"
+
+    def progress(self, obj):
+        progress = obj.get_progress()
+        if progress is None:
+            return "-"
+        return "{0:.0%}".format(progress)
+
+    def eta(self, obj):
+        eta = obj.get_eta()
+        if eta is None:
+            return "-"
+        return eta
+
+    eta.short_description = "ETA"
 
 
 admin.site.register(SavedReport, SavedReportAdmin)
@@ -0,0 +1,85 @@
+"""
+Async generators behind the asynchronous report API.
+
+They need Python 3.6, so they live apart from `base` and `progress`, which
+still have to import on Python 3.5, and are only imported by the async
+methods that use them.
+"""
+import csv
+from itertools import islice
+import logging
+import time
+from typing import AsyncIterator
+
+from asgiref.sync import sync_to_async
+
+logger = logging.getLogger(__name__)
+
+
+async def iter_queryset(report):
+    """
+    Iterate the queryset of `report` asynchronously. Uses
+    `QuerySet.aiterator` where available, otherwise fetches `async_chunk_size`
+    rows at a time from a server-side iterator in a worker thread.
+    """
+    queryset = await sync_to_async(report.get_queryset)()
+    if hasattr(queryset, "aiterator"):
+        async for obj in queryset.aiterator(chunk_size=report.async_chunk_size):
+            yield obj
+        return
+
+    iterator = queryset.iterator()
+    fetch = sync_to_async(lambda: list(islice(iterator, report.async_chunk_size)))
+    while True:
+        chunk = await fetch()
+        if not chunk:
+            break
+        for obj in chunk:
+            yield obj
+
+
+async def track(tracker, aiterable):
+    """
+    Yield each item of `aiterable`, counting them on the `ProgressTracker`
+    """
+    batch = tracker.batch
+    pending = 0
+    async for item in aiterable:
+        yield item
+        pending += 1
+        if pending == batch:
+            tracker.rows += pending
+            pending = 0
+            if time.monotonic() - tracker.last_write >= tracker.interval:
+                await sync_to_async(tracker.flush)()
+    tracker.rows += pending
+
+
+async def stream_csv(report) -> AsyncIterator[str]:
+    """
+    Yield the CSV of `report` one line at a time, as `ModelReport.stream_csv`
+    """
+    from .base import _Line
+
+    # Resolve the lookups first, so the header matches the row keys
+    field_lookups = await sync_to_async(report.get_run_field_lookups)()
+    objs = iter_queryset(report)
+    sample = []
+    if not report.fields and report.schema_sample_size:
+        async for obj in objs:
+            sample.append(await report.aget_row_data(obj, field_lookups))
+            if len(sample) >= report.schema_sample_size:
+                break
+    fields = await sync_to_async(report.get_stream_fields)(sample)
+
+    line = _Line()
+    csv_writer = csv.writer(line)
+    yield csv_writer.writerow(fields)
+    for row in sample:
+        yield csv_writer.writerow([row.get(k, "") for k in fields])
+    async for obj in objs:
+        row = await report.aget_row_data(obj, field_lookups)
+        try:
+            yield csv_writer.writerow([row.get(k, "") for k in fields])
+        except Exception:
+            logger.error("Failed to write row %s", row, exc_info=True)
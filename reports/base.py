@@ -1,18 +1,44 @@
 from collections import OrderedDict
 from datetime import datetime
-from typing import List
+from itertools import chain, islice
+from typing import Iterator, List
 import csv
+import hashlib
+import inspect
 import io
 import logging
+import threading
 
+import django
 from django.template.defaultfilters import slugify
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.auth.models import User
 from django.template.defaultfilters import title
 from django.apps import apps
 from django.conf import settings
-
+from django.contrib import messages
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .columns import (
+    IOBoundColumn,
+    IOColumnExecutor,
+    bind_columns,
+    get_column_metrics,
+)
 from .models import SavedReport
+from .profiling import (
+    REPORTS_PROFILE,
+    REPORTS_PROFILE_ACTIONS,
+    REPORTS_PROFILE_MODE,
+    ReportProfiler,
+)
+from .progress import ProgressTracker, estimate_count
+from .rowstore import REPORTS_DATA_MEMORY_BUDGET, RowStore
+from .schema import Schema
+from .singleflight import single_flight
 
 logger = logging.getLogger(__name__)
 EMPTY_DATA_XML = "<report/>"
@@ -33,15 +59,19 @@ class ModelReport(object):
     in a model to CSV.
 
     Call tree:
-        -> run_report
-            -> collect_data
-                -> get_row_data
-                    -> get_field_lookups
-                        -> get_model_fields
-            -> generate_output
-                -> as_csv
-                    -> get_fields
-            -> save | download
+        -> run_single_flight
+            -> execute_report
+                -> run_report
+                    -> start_saved_report
+                    -> collect_data
+                        -> get_row_data
+                            -> get_field_lookups
+                                -> get_model_fields
+                    -> complete_report
+                        -> generate_output
+                            -> as_csv
+                                -> get_fields
+                        -> save | download
 
     The django admin calls this class, which re-instantiates this
     class to run the report. It's the circle of life.
@@ -62,15 +92,93 @@ class ModelReport(object):
     # running the report. If only a small bit of data is being accessed
     # from a model, turning this off may result in smaller queries. For
     # reports that follow a lot of relationships, leave this on to get
-    # faster report generation (at the expense of larger queries).
+    # faster report generation (at the expense of larger queries). A list of
+    # relations may be given instead, to only join those.
     select_related = True
 
-    # See `get_fields`
+    # If True, identical runs (same report class, query and user) started
+    # while one is already in progress attach to that run and receive its
+    # SavedReport, rather than scanning the database again.
+    # See `run_single_flight`
+    single_flight = True
+
+    # Maximum number of seconds a single-flight run holds its lock. Defaults
+    # to the REPORTS_SINGLE_FLIGHT_TIMEOUT setting.
+    single_flight_timeout = None
+
+    # Longest a coalesced caller waits for the run in flight, in seconds.
+    # Defaults to the REPORTS_SINGLE_FLIGHT_WAIT setting, or else to the lock
+    # timeout.
+    single_flight_wait = None
+
+    # Name of a column whose value only ever increases (e.g. "date_modified"
+    # or "pk"). When set, each run records the highest value it covered on its
+    # SavedReport, and the next run of the same report only collects rows
+    # past it. See `apply_watermark`
+    incremental_field = None
+
+    # How an incremental run writes its output:
+    #   "delta"  - a file holding only the new rows
+    #   "merged" - the previous report's file with the new rows appended.
+    #              The previous output is reused as-is, so this requires the
+    #              default CSV `generate_output`.
+    incremental_output = "delta"
+
+    # If True, rows processed, the estimated total, throughput and ETA are
+    # recorded on the SavedReport while the report runs. See `track_progress`
+    progress = True
+
+    # How the total shown alongside progress is estimated: "count" runs a
+    # COUNT query, "planner" asks the query planner (PostgreSQL, falling back
+    # to a count elsewhere), None skips the estimate, and the extra query.
+    progress_estimate = None
+
+    # If True, runs are profiled and the profile is attached to the
+    # SavedReport (`profile_file` and `profile_summary`). None follows the
+    # REPORTS_PROFILE setting. See `execute_report`
+    profile = None
+
+    # "cprofile" or "sampling". None follows the REPORTS_PROFILE_MODE setting
+    profile_mode = None
+
+    # Number of rows whose I/O bound columns (see `reports.columns.io_bound`)
+    # are evaluated together in their thread pools
+    io_chunk_size = 500
+
+    # Set while `collect_data` evaluates I/O bound columns itself, so that
+    # `get_row_data` leaves them out
+    _defer_io_columns = False
+
+    # Number of rows fetched per database round trip by the async path when
+    # `QuerySet.aiterator` is not available (Django < 4.1)
+    async_chunk_size = 2000
+
+    # See `get_fields`. Declaring `fields` up front fixes the header, so
+    # nothing needs to be inferred from the data.
     fields, field_lookups = [], []
 
+    # When set, `stream_csv` and `astream_csv` infer the header from the
+    # first `schema_sample_size` rows, unless `fields` are declared. Useful
+    # when `get_row_data` is overridden to return other keys than those of
+    # `get_field_lookups`. Keys first appearing after the sample are dropped.
+    schema_sample_size = None
+
     # The rows of data populated by `generate`
     data = []
 
+    # Approximate number of bytes of collected rows to hold in memory. Beyond
+    # it, `collect_data` spills rows to a temporary file (see RowStore).
+    # Defaults to the REPORTS_DATA_MEMORY_BUDGET setting; None keeps every row
+    # in a plain list.
+    data_memory_budget = REPORTS_DATA_MEMORY_BUDGET
+
+    # The SavedReport of the run in progress, created by `run_report` unless
+    # `save` is overridden. See `start_saved_report`
+    saved_report = None
+
+    # The ProgressTracker of the run in progress. See `track_progress`
+    progress_tracker = None
+
     # A ModelReport can be populated by default, with a queryset. Although usage
     # within the admin will override this, it can be useful for testing within a
     # Python environment (shell/tests) to define this attribute
@@ -86,6 +194,33 @@ class ModelReport(object):
         self.app_label = kwargs.get("app_label")
         self.model_name = kwargs.get("model_name")
         self.queryset = kwargs.get("queryset", self.queryset)
+        self.profile = kwargs.get("profile", self.profile)
+
+        # A copy of a report registered as a superuser-only action which runs
+        # the report with profiling, see Reports.register
+        self.profile_action = kwargs.get("profile_action", False)
+        if self.profile_action:
+            self.short_description = self.__name__ = "%s (profile)" % self.name
+
+        if (
+            self.incremental_field
+            and self.incremental_output == "merged"
+            and type(self).generate_output is not ModelReport.generate_output
+        ):
+            raise ImproperlyConfigured(
+                "%s: incremental_output = 'merged' is only supported for CSV "
+                "output" % self.__class__.__name__
+            )
+
+        # Statistics gathered while running, e.g. memoized column hit rates
+        self.metrics = {}
+
+        # The columns found in the collected data, see `add_row`
+        self.schema = Schema()
+
+        # Copies of the memoized columns used by the run in progress, see
+        # `get_run_field_lookups`
+        self._memoized_columns = {}
 
         # If the admin has not defined a query through __call__, use the defined
         # `queryset` attribute.
@@ -119,6 +254,7 @@ class ModelReport(object):
             "queryset": queryset,
             "app_label": model._meta.app_label,
             "model_name": model._meta.object_name,
+            "profile": self.profile,
         }
         return params
 
@@ -140,6 +276,12 @@ class ModelReport(object):
             )
             return False
 
+        if self.profile_action and not request.user.is_superuser:
+            model_admin.message_user(
+                request, "Only superusers may profile reports.", level=messages.ERROR
+            )
+            return False
+
         # Bind request so we're not passing it around through various hook functions
         self.request = request
 
@@ -147,7 +289,7 @@ class ModelReport(object):
         report = self.__class__(**params)
 
         try:
-            saved_report = report.run_report()
+            saved_report = report.run_single_flight()
         except Exception as exc:
             logger.error("Failed to run report", exc_info=True)
             self.send_error_notification(model_admin)
@@ -161,9 +303,128 @@ class ModelReport(object):
         """
         Default method responsible for generating the output of this report.
         """
-        self.collect_data()
+        self.start_saved_report()
+        try:
+            self.collect_data()
+            saved_report = self.complete_report()
+        except Exception:
+            self.discard_saved_report()
+            raise
+        return saved_report
+
+    def start_saved_report(self) -> SavedReport:
+        """
+        Create the SavedReport of this run up front, so progress can be
+        followed in the admin while the report runs. Reports overriding `save`
+        (e.g. to download or email the output) may never complete it, so they
+        get none, and no progress is recorded for them.
+        """
+        if not self.uses_default_save():
+            self.saved_report = None
+            return None
+        self.saved_report = SavedReport.objects.create(
+            report=self.name, run_by=self.get_user()
+        )
+        return self.saved_report
+
+    def discard_saved_report(self):
+        """
+        Delete the SavedReport created by `start_saved_report` for a run that
+        failed
+        """
+        if self.saved_report is not None:
+            self.saved_report.delete()
+            self.saved_report = None
+
+    def uses_default_save(self):
+        """
+        Return whether the output is stored by the default `save`, which
+        completes the SavedReport created by `start_saved_report`
+        """
+        return type(self).save is ModelReport.save
+
+    def complete_report(self) -> SavedReport:
+        """
+        Generate the output from the collected data and save it
+        """
         output = self.generate_output()
+        if self.incremental_field and self.incremental_output == "merged":
+            output = self.merge_output(output)
         saved_report = self.save(output)
+        logger.info("Report %s metrics: %s", self.name, self.metrics)
+        return saved_report
+
+    def get_single_flight_key(self):
+        """
+        Return the key identifying identical runs of this report, built from
+        the report class, the query and the user. Returning None disables
+        coalescing for this run.
+        """
+        try:
+            sql = str(self.query)
+        except Exception:
+            # e.g. EmptyResultSet; nothing worth coalescing
+            return None
+        ident = "{0}.{1}|{2}|{3}|{4}".format(
+            self.__class__.__module__,
+            self.__class__.__qualname__,
+            sql,
+            self.user_id,
+            # Don't hand an unprofiled run to a caller asking for a profile
+            self.should_profile(),
+        )
+        return hashlib.sha1(ident.encode("utf-8")).hexdigest()
+
+    def run_single_flight(self) -> SavedReport:
+        """
+        Run the report through `run_report`, unless an identical run is already
+        in progress, in which case wait for it and return its SavedReport.
+        """
+        key = self.get_single_flight_key() if self.single_flight else None
+        if key is None:
+            return self.execute_report()
+
+        # Keep hold of the leader's instance; followers receive the pk
+        result = {}
+
+        def run():
+            result["saved_report"] = self.execute_report()
+            saved_report = result["saved_report"]
+            return saved_report.pk if saved_report is not None else None
+
+        pk = single_flight(
+            key,
+            run,
+            timeout=self.single_flight_timeout,
+            wait=self.single_flight_wait,
+        )
+        if "saved_report" in result:
+            return result["saved_report"]
+        if pk is None:
+            return None
+        return SavedReport.objects.get(pk=pk)
+
+    def should_profile(self):
+        return REPORTS_PROFILE if self.profile is None else self.profile
+
+    def execute_report(self) -> SavedReport:
+        """
+        Run the report through `run_report`, profiling it when `profile` (or
+        the REPORTS_PROFILE setting) is set, in which case the `.pstats` file
+        and a text summary are attached to the SavedReport. Only the thread
+        running the report is profiled.
+        """
+        if not self.should_profile():
+            return self.run_report()
+
+        profiler = ReportProfiler(mode=self.profile_mode or REPORTS_PROFILE_MODE)
+        with profiler:
+            saved_report = self.run_report()
+        if saved_report is not None:
+            filename = "{0}.pstats".format(self.get_filename().rsplit(".", 1)[0])
+            saved_report.save_profile(
+                profiler.get_stats(), profiler.get_summary(), filename
+            )
         return saved_report
 
     def send_error_notification(self, model_admin):
@@ -194,11 +455,142 @@ class ModelReport(object):
         """
         Collect the rows of data for the report
         """
-        self.data = []  # Clear existing data
-        for obj in self.get_queryset():
-            self.data.append(self.get_row_data(obj))
+        self.reset_data()  # Clear existing data
+        self.clear_column_caches()
+        try:
+            io_columns = self.get_io_columns()
+            rows = self.track_progress(self.get_queryset())
+            if io_columns:
+                self.collect_io_data(rows, io_columns)
+            else:
+                for obj in rows:
+                    self.add_row(self.get_row_data(obj))
+            self.metrics["columns"] = self.get_run_column_metrics()
+        finally:
+            self.clear_column_caches()
         return self.data
 
+    def get_run_field_lookups(self):
+        """
+        Return `get_field_lookups`, with each memoized column replaced by a
+        copy belonging to this run. A memoized column declared on the class is
+        shared by every instance, so concurrent runs would otherwise share,
+        and clear, each other's cache.
+        """
+        return bind_columns(self.get_field_lookups(), self._memoized_columns)
+
+    def get_run_column_metrics(self):
+        """
+        Return the cache statistics of the memoized columns used by the run
+        """
+        columns = self._memoized_columns.items()
+        return get_column_metrics(
+            (field, column) for field, (declared, column) in columns
+        )
+
+    def uses_field_lookups(self):
+        """
+        Return whether rows are built from `get_field_lookups`, i.e. whether
+        `get_row_data` is left as it is. Reports overriding it may return
+        other keys, so `get_field_lookups` is not called on their behalf: it
+        fills `field_lookups`, and so the header, with the model's fields.
+        """
+        return type(self).get_row_data is ModelReport.get_row_data
+
+    def get_io_columns(self):
+        """
+        Return the `(field, column)` pairs of the I/O bound columns, which
+        `collect_data` evaluates concurrently (see `collect_io_data`)
+        """
+        if not self.uses_field_lookups():
+            return []
+        return [
+            (field, value)
+            for field, value in self.get_run_field_lookups()
+            if isinstance(value, IOBoundColumn)
+        ]
+
+    def clear_column_caches(self):
+        """
+        Drop the memoized column caches of the run
+        """
+        self._memoized_columns = {}
+
+    def reset_data(self):
+        """
+        Start collecting data afresh, into the container of `get_data_store`
+        """
+        self.data = self.get_data_store()
+        # A RowStore keeps a schema of its own
+        if isinstance(self.data, RowStore):
+            self.schema = self.data.columns
+        else:
+            self.schema = Schema()
+        return self.data
+
+    def add_row(self, row):
+        """
+        Add a row to the collected data, discovering its columns on the way,
+        so the header is known without another pass over the data. Reports
+        overriding `collect_data` should prefer this to `self.data.append`.
+        """
+        if self.schema is not getattr(self.data, "columns", None):
+            self.schema.update(row)
+        self.data.append(row)
+
+    def get_data_store(self):
+        """
+        Return the empty container `collect_data` appends rows to: a list, or
+        a RowStore when a memory budget is set. Either can be iterated, sorted
+        with `sort(key=...)` and measured with `len`.
+        """
+        if self.data_memory_budget is None:
+            return []
+        return RowStore(self.data_memory_budget)
+
+    def collect_io_data(self, objs, io_columns):
+        """
+        Collect rows in chunks of `io_chunk_size`, evaluating the I/O bound
+        columns of each chunk concurrently in their thread pools.
+        """
+        self._defer_io_columns = True
+        try:
+            with IOColumnExecutor(io_columns) as executor:
+                objs = iter(objs)
+                while True:
+                    chunk = list(islice(objs, self.io_chunk_size))
+                    if not chunk:
+                        break
+                    rows = [self.get_row_data(obj) for obj in chunk]
+                    executor.fill(chunk, rows)
+                    for row in rows:
+                        self.add_row(row)
+        finally:
+            self._defer_io_columns = False
+
+    def track_progress(self, queryset):
+        """
+        Wrap the iteration over `queryset` so progress is periodically recorded
+        on the SavedReport of the run. Returns `queryset` untouched when there
+        is nothing to record progress on.
+        """
+        if not self.progress or self.saved_report is None:
+            return queryset
+        self.progress_tracker = ProgressTracker(
+            self.saved_report, total=self.estimate_total(queryset)
+        )
+        return self.progress_tracker.track(queryset)
+
+    def estimate_total(self, queryset):
+        """
+        Return the expected number of rows, used for the progress and ETA
+        """
+        if self.progress_estimate == "count":
+            return queryset.count()
+        elif self.progress_estimate == "planner":
+            return estimate_count(queryset)
+        return None
+
     def get_row_data(self, obj):
         """
         Collect a single row of data from the given `obj`. By default, the data
@@ -209,11 +601,15 @@ class ModelReport(object):
             A data object from the `objects` list passed to generate()
         """
         data = OrderedDict()
-        field_lookups = self.get_field_lookups()
+        field_lookups = self.get_run_field_lookups()
         for field, value in field_lookups:
             # Send the object to any callable
             if callable(value):
-                data[field] = value(obj)
+                if self._defer_io_columns and isinstance(value, IOBoundColumn):
+                    # Placeholder, keeping the column order; see collect_io_data
+                    data[field] = None
+                else:
+                    data[field] = value(obj)
             # Check if it's a named property or callable on the object
             elif hasattr(obj, value):
                 val = getattr(obj, value)
@@ -222,6 +618,154 @@ class ModelReport(object):
                 data[field] = value
         return data
 
+    async def arun_report(self) -> SavedReport:
+        """
+        Asynchronous counterpart of `run_report`, for use under ASGI. Rows are
+        fetched with the async ORM iterator, so the event loop is only blocked
+        for the database round trips of each chunk.
+        """
+        from asgiref.sync import sync_to_async
+
+        await sync_to_async(self.start_saved_report)()
+        try:
+            await self.acollect_data()
+            saved_report = await sync_to_async(self.complete_report)()
+        except Exception:
+            await sync_to_async(self.discard_saved_report)()
+            raise
+        return saved_report
+
+    async def acollect_data(self) -> List[OrderedDict]:
+        """
+        Asynchronous counterpart of `collect_data`
+        """
+        from asgiref.sync import sync_to_async
+
+        self.reset_data()  # Clear existing data
+        self.clear_column_caches()
+        try:
+            field_lookups = await sync_to_async(self.get_run_field_lookups)()
+            async for obj in await self.atrack_progress(self.aiter_queryset()):
+                self.add_row(await self.aget_row_data(obj, field_lookups))
+            self.metrics["columns"] = self.get_run_column_metrics()
+        finally:
+            self.clear_column_caches()
+        return self.data
+
+    def aiter_queryset(self):
+        """
+        Iterate the report queryset asynchronously. Uses `QuerySet.aiterator`
+        where available, otherwise fetches `async_chunk_size` rows at a time
+        from a server-side iterator in a worker thread.
+        """
+        from .aio import iter_queryset
+
+        return iter_queryset(self)
+
+    async def atrack_progress(self, aiterable):
+        """
+        Asynchronous counterpart of `track_progress`
+        """
+        from asgiref.sync import sync_to_async
+
+        if not self.progress or self.saved_report is None:
+            return aiterable
+        queryset = await sync_to_async(self.get_queryset)()
+        total = await sync_to_async(self.estimate_total)(queryset)
+        self.progress_tracker = ProgressTracker(self.saved_report, total=total)
+        return self.progress_tracker.atrack(aiterable)
+
+    async def aget_row_data(self, obj, field_lookups=None):
+        """
+        Asynchronous counterpart of `get_row_data`. Coroutine functions, and
+        callables returning an awaitable, are awaited, and I/O bound columns
+        run in a worker thread; everything else is evaluated as in
+        `get_row_data`. Other synchronous callables run on the event loop, so
+        they should neither block nor trigger queries (use `select_related`).
+
+        Pass the `field_lookups` of the run when calling this for every row,
+        so they are not resolved again in a worker thread each time.
+        """
+        from asgiref.sync import sync_to_async
+
+        data = OrderedDict()
+        if field_lookups is None:
+            field_lookups = await sync_to_async(self.get_run_field_lookups)()
+        for field, value in field_lookups:
+            if isinstance(value, IOBoundColumn):
+                data[field] = await value.acall(obj)
+            elif callable(value):
+                result = value(obj)
+                data[field] = await result if inspect.isawaitable(result) else result
+            elif hasattr(obj, value):
+                val = getattr(obj, value)
+                data[field] = val() if callable(val) else val
+            else:
+                data[field] = value
+        return data
+
+    def stream_csv(self) -> Iterator[str]:
+        """
+        Yield the report as CSV, one line at a time, without collecting the
+        whole of the data first. The header comes from `get_stream_fields`.
+        """
+        if self.uses_field_lookups():
+            self.get_field_lookups()
+        rows = (self.get_row_data(obj) for obj in self.get_queryset())
+        sample = []
+        if not self.fields and self.schema_sample_size:
+            sample = list(islice(rows, self.schema_sample_size))
+        fields = self.get_stream_fields(sample)
+
+        line = _Line()
+        csv_writer = csv.writer(line)
+        yield csv_writer.writerow(fields)
+        for row in chain(sample, rows):
+            try:
+                yield csv_writer.writerow([row.get(k, "") for k in fields])
+            except Exception:
+                logger.error("Failed to write row %s", row, exc_info=True)
+
+    def astream_csv(self):
+        """
+        Asynchronous counterpart of `stream_csv`, returning an async iterator
+        """
+        from .aio import stream_csv
+
+        return stream_csv(self)
+
+    def get_stream_fields(self, sample):
+        """
+        Return the header of a streamed report: the declared `fields`, the
+        columns of the `sample` rows when `schema_sample_size` is set, or else
+        those of `get_fields`, which must not depend on collected data.
+        """
+        if self.fields:
+            return self.fields
+        if self.schema_sample_size:
+            return list(Schema.from_rows(sample))
+        return self.get_fields()
+
+    def astreaming_response(self):
+        """
+        Return a StreamingHttpResponse downloading the report as CSV through
+        `astream_csv`. Only Django 4.2+ streams async iterators; older
+        versions iterate the response synchronously, so get `stream_csv`
+        instead, which must then be served under WSGI and cannot await
+        coroutine columns.
+        """
+        from django.http import StreamingHttpResponse
+
+        if django.VERSION >= (4, 2):
+            content = self.astream_csv()
+        else:
+            content = self.stream_csv()
+        response = StreamingHttpResponse(content, content_type="text/csv")
+        response["Content-Disposition"] = 'attachment; filename="{0}"'.format(
+            self.get_filename()
+        )
+        return response
+
     def generate_output(self) -> io.StringIO:
         """
         By default generates and returns CSV output.
@@ -237,10 +781,114 @@ class ModelReport(object):
         """
         qs = self.get_model().objects.all()
         qs.query = self.query
-        if self.select_related:
+        if self.select_related is True:
             qs = qs.select_related()
+        elif self.select_related:
+            qs = qs.select_related(*self.select_related)
+        if self.incremental_field:
+            qs = self.apply_watermark(qs)
         return qs
 
+    def get_watermark_key(self):
+        """
+        Return the key under which the watermark of this report is recorded,
+        built from the report class, the model and the query selecting the
+        rows. Reports sharing a `name` keep watermarks of their own, and so do
+        runs over another selection (e.g. an admin action on a few rows, or
+        `runreport --filter`), which then neither use nor advance the
+        watermark of runs over the whole `queryset`. Returns None, recording
+        no watermark, when the query cannot match any rows.
+        """
+        try:
+            sql = str(self.query)
+        except Exception:
+            # e.g. EmptyResultSet
+            return None
+        return "{0}.{1}:{2}:{3}".format(
+            self.__class__.__module__,
+            self.__class__.__qualname__,
+            self.get_model()._meta.label_lower,
+            hashlib.sha1(sql.encode("utf-8")).hexdigest(),
+        )
+
+    def get_previous_report(self):
+        """
+        Return the most recent SavedReport of this report which recorded a
+        watermark, or None on the first incremental run.
+        """
+        key = self.get_watermark_key()
+        if key is None:
+            return None
+        return (
+            SavedReport.objects.filter(watermark_key=key, watermark__isnull=False)
+            .order_by("-date_created", "-pk")
+            .first()
+        )
+
+    def apply_watermark(self, qs):
+        """
+        Limit the queryset to rows past the previous run's watermark, up to the
+        highest value present when this run started. The bounds are resolved
+        once per run so repeated calls to `get_queryset` agree.
+        """
+        field = self.incremental_field
+        if not hasattr(self, "watermark"):
+            self.previous_report = self.get_previous_report()
+            self.previous_watermark = None
+            if self.previous_report is not None:
+                self.previous_watermark = self._get_incremental_model_field().to_python(
+                    self.previous_report.watermark
+                )
+            pending = qs
+            if self.previous_watermark is not None:
+                pending = qs.filter(**{"%s__gt" % field: self.previous_watermark})
+            # Snapshot the upper bound so rows written during the run are left
+            # for the next one, rather than being skipped or repeated.
+            self.watermark = pending.aggregate(watermark=Max(field))["watermark"]
+            if self.watermark is None:
+                self.watermark = self.previous_watermark
+
+        if self.previous_watermark is not None:
+            qs = qs.filter(**{"%s__gt" % field: self.previous_watermark})
+        if self.watermark is None:
+            return qs.none()
+        return qs.filter(**{"%s__lte" % field: self.watermark})
+
+    def get_watermark_display(self):
+        """
+        Serialise the watermark of this run for storage on the SavedReport
+        """
+        watermark = getattr(self, "watermark", None)
+        if watermark is None:
+            return None
+        if hasattr(watermark, "isoformat"):
+            return watermark.isoformat()
+        return str(watermark)
+
+    def merge_output(self, output):
+        """
+        Append the rows of `output` to the file of the previous incremental run,
+        without reading or re-serialising its rows.
+        """
+        previous = getattr(self, "previous_report", None)
+        if previous is None or not previous.report_file:
+            return output
+
+        # Drop the header of the new output, the previous file already has one
+        new_rows = output.split("\r\n", 1)[1] if output else ""
+        previous.report_file.open("rb")
+        try:
+            merged = previous.report_file.read()
+        finally:
+            previous.report_file.close()
+        return merged + new_rows.encode("utf-8")
+
+    def _get_incremental_model_field(self):
+        opts = self.get_model()._meta
+        if self.incremental_field == "pk":
+            return opts.pk
+        return opts.get_field(self.incremental_field)
+
     def get_user(self):
         if self.user_id is None:
             return
@@ -265,8 +913,19 @@ class ModelReport(object):
             Send an email to the user notifying them that their report
             is complete.
         """
-        user = self.get_user()
-        saved = SavedReport.objects.create(report=self.name, run_by=user)
+        saved = self.saved_report
+        if saved is None:
+            saved = SavedReport(report=self.name, run_by=self.get_user())
+        if self.incremental_field:
+            saved.watermark_key = self.get_watermark_key()
+            if saved.watermark_key is not None:
+                saved.watermark = self.get_watermark_display()
+        if self.progress_tracker is not None:
+            for name, value in self.progress_tracker.get_values().items():
+                setattr(saved, name, value)
+        elif isinstance(self.data, (list, RowStore)):
+            saved.rows_processed = len(self.data)
+        saved.date_completed = timezone.now()
         saved.save_file(output, self.get_filename())
         return saved
 
@@ -361,20 +1020,31 @@ class ModelReport(object):
         # Straight up dict
         if isinstance(self.data, dict):
             fieldnames = self.data.keys()
+        # A RowStore always knows its columns
+        elif isinstance(self.data, RowStore):
+            fieldnames = list(self.data.columns)
+        # The columns were discovered while collecting, see `add_row`
+        elif len(self.schema):
+            fieldnames = list(self.schema)
         # Do we have a list of dicts?
         elif isinstance(self.data, list):
-            fieldnames = []
             # It's possible that each dict in the list has different
-            # keys, so we get a set of all keys to use for the header row.
-            # A real `set` object isn't used because we want to retain order
-            # wherever possible.
-            for d in self.data:
-                for k in d.keys():
-                    if k not in fieldnames:
-                        fieldnames.append(k)
+            # keys, so we get an ordered set of all keys to use for the header
+            # row, to retain order wherever possible.
+            fieldnames = list(Schema.from_rows(self.data))
         return fieldnames
 
 
+class _Line(object):
+    """
+    File-like object handing back each line written by `csv.writer`, rather
+    than buffering it.
+    """
+
+    def write(self, value):
+        return value
+
+
 class Reports(object):
     """
     For registering Models with reports
@@ -386,6 +1056,10 @@ class Reports(object):
 
     def __init__(self, *args, **kwargs):
         self._models = {}
+        # Dotted paths of report classes not imported yet, by model. See
+        # `register_lazy`
+        self._lazy = {}
+        self._lock = threading.RLock()
 
     def register(self, model, report_class=None, **kwargs):
         """
@@ -407,18 +1081,112 @@ class Reports(object):
         else:
             self._models[model] = [report_class()]
 
+        # Offer superusers a profiled run of the report as a separate action
+        if REPORTS_PROFILE_ACTIONS:
+            self._models[model].append(
+                report_class(profile=True, profile_action=True)
+            )
+
+    def register_lazy(self, model, report_path):
+        """
+        Register the report class at the dotted `report_path` against `model`,
+        without importing it. The class is imported, and registered, when the
+        reports of `model` are first needed.
+        """
+        logger.debug("Reports.register_lazy: %s %s" % (model, report_path))
+        with self._lock:
+            self._lazy.setdefault(model, []).append(report_path)
+
+    def _resolve(self, model):
+        """
+        Import and register the lazily registered reports of `model`
+        """
+        with self._lock:
+            for report_path in self._lazy.pop(model, []):
+                self.register(model, import_string(report_path))
+
     def _get_registry(self):
-        registry = self._models.copy()
+        with self._lock:
+            for model in list(self._lazy):
+                self._resolve(model)
+            registry = self._models.copy()
         return registry
 
     registry = property(_get_registry)
 
-    def discover(self):
+    def get_reports(self, name=None, model=None, include_global=False):
+        """
+        Return the `(model, report)` pairs of the registry, optionally limited
+        to those registered against `model` (and the global reports too, with
+        `include_global`), or whose name or class name is `name`. Global
+        reports are registered against a model of None.
+        """
+        if model is not None:
+            # Only import the reports needed
+            models = [model, None] if include_global else [model]
+            registry = {}
+            for registered_model in models:
+                self._resolve(registered_model)
+                registry[registered_model] = self._models.get(registered_model, [])
+        else:
+            registry = self.registry
+
+        matches = []
+        for registered_model, reports in registry.items():
+            for report in reports:
+                # Profiling actions are copies of another registered report
+                if report.profile_action:
+                    continue
+                if name is not None and name not in (
+                    report.name,
+                    report.__class__.__name__,
+                ):
+                    continue
+                matches.append((registered_model, report))
+        return matches
+
+    def get_manifest(self):
+        """
+        Return the reports to register lazily, as a dict of dotted report
+        class paths by model label ("app_label.ModelName", or None for global
+        reports). They come from the REPORTS_MANIFEST setting, and from the
+        entry points of the REPORTS_ENTRY_POINT_GROUP setting, if set. Entry
+        points are named after the model label, optionally followed by "/"
+        and any suffix to keep names unique, or "*" for global reports:
+
+            [django_reports]
+            shop.Order = shop.report:OrderReport
+            shop.Order/invoices = shop.report:InvoiceReport
+
+        Returns None when neither setting is used.
+        """
+        manifest = getattr(settings, "REPORTS_MANIFEST", None)
+        group = getattr(settings, "REPORTS_ENTRY_POINT_GROUP", None)
+        if manifest is None and group is None:
+            return None
+
+        merged = {}
+        for label, report_paths in (manifest or {}).items():
+            merged.setdefault(label, []).extend(report_paths)
+        if group is not None:
+            for entry_point in _get_entry_points(group):
+                label = entry_point.name.split("/", 1)[0]
+                label = None if label == "*" else label
+                merged.setdefault(label, []).append(
+                    entry_point.value.replace(":", ".")
+                )
+        return merged
+
+    def discover(self, site=None):
         """
         Discover INSTALLED_APPS reports.py modules and fail silently when
         not present. This forces an import on them to register any report
         configuration.
 
+        When a manifest is configured (see `get_manifest`), nothing is
+        imported: the reports it lists are registered lazily instead, and
+        only imported once their model's admin, or a command, needs them.
+
         This should be called in a place that's loaded once. It is recommended
         this lives within an AppConfig, e.g.
 
@@ -429,9 +1197,17 @@ class Reports(object):
                 reports.discover()
         """
         from importlib import import_module
-        from django.conf import settings
         from django.utils.module_loading import module_has_submodule
 
+        manifest = self.get_manifest()
+        if manifest is not None:
+            for label, report_paths in manifest.items():
+                model = apps.get_model(label) if label else None
+                for report_path in report_paths:
+                    self.register_lazy(model, report_path)
+            self._add_actions(site)
+            return
+
         for app in settings.INSTALLED_APPS:
             mod = import_module(app)
             # Attempt to import the app's admin module.
@@ -445,44 +1221,89 @@ class Reports(object):
                 if module_has_submodule(mod, self.report_module_name):
                     raise
 
-        self._add_actions()
+        self._add_actions(site)
 
-    def _add_actions(self):
+    def _add_actions(self, site=None):
         """
         Register the actions for each model
         """
         from django.contrib import admin
 
-        for model, model_admin in admin.site._registry.items():
-            if model not in self.registry:
+        site = site or admin.site
+        for model, model_admin in site._registry.items():
+            lazy = model in self._lazy
+            if not lazy and model in self._models:
+                self._add_model_actions(model_admin, self._models[model])
+            # Profiling copies of global reports may appear on any changelist
+            if lazy or REPORTS_PROFILE_ACTIONS:
+                self._wrap_get_actions(model, model_admin, lazy)
+
+        # Add any global actions (not associated with a specific model). These
+        # appear on every changelist, so are never deferred.
+        self._resolve(None)
+        for report in self._models.get(None, []):
+            logger.info("Add %s globally" % (report,))
+            site.add_action(report)
+
+    def _wrap_get_actions(self, model, model_admin, lazy):
+        """
+        Wrap `model_admin.get_actions`, through which the admin finds actions
+        for its changelist. When `lazy`, the reports of `model` are imported
+        and their actions added on the first call. The profiling copies of
+        reports are left out for users other than superusers.
+        """
+        get_model_actions = model_admin.get_actions
+        pending = lazy
+
+        def get_actions(request):
+            nonlocal pending
+            if pending:
+                with self._lock:
+                    if pending:
+                        self._resolve(model)
+                        reports = self._models.get(model, [])
+                        self._add_model_actions(model_admin, reports)
+                        pending = False
+            actions = get_model_actions(request)
+            if not getattr(request.user, "is_superuser", False):
+                for name, action in list(actions.items()):
+                    if getattr(action[0], "profile_action", False):
+                        del actions[name]
+            return actions
+
+        model_admin.get_actions = get_actions
+
+    def _add_model_actions(self, model_admin, reports):
+        # It seems that if the model_admin class doesn't explicitly set an
+        # `actions` property, the action will be added on the super class,
+        # thus appearing everywhere. So make sure there is a specific class
+        # based property set.
+        if not model_admin.__class__.actions:
+            model_admin.__class__.actions = []
+
+        # Django finds actions on the class, not the instance, so
+        # add actions to the class definition.
+        for report in reports:
+            actions = model_admin.__class__.actions
+            if isinstance(actions, list):
+                actions.append(report)
+            elif isinstance(actions, tuple):
+                model_admin.__class__.actions = actions + (report,)
+            else:
+                logger.error(
+                    "Unexpected type for ModelAdmin actions when registering %s",
+                    report.name,
+                )
                 continue
 
-            # It seems that if the model_admin class doesn't explicitly set an
-            # `actions` property, the action will be added on the super class,
-            # thus appearing everywhere. So make sure there is a specific class
-            # based property set.
-            if not model_admin.__class__.actions:
-                model_admin.__class__.actions = []
-
-            # Django finds actions on the class, not the instance, so
-            # add actions to the class definition.
-            for report in self.registry[model]:
-                actions = model_admin.__class__.actions
-                if isinstance(actions, list):
-                    actions.append(report)
-                elif isinstance(actions, tuple):
-                    model_admin.__class__.actions = actions + (report,)
-                else:
-                    logger.error(
-                        "Unexpected type for ModelAdmin actions when registering %s",
-                        report.name,
-                    )
-                    continue
 
-        # Add any global actions (not associated with a specific model)
-        for report in self.registry.get(None, []):
-            logger.info("Add %s globally" % (report,))
-            admin.site.add_action(report)
+def _get_entry_points(group):
+    from importlib.metadata import entry_points
+
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        return eps.select(group=group)
+    return eps.get(group, [])
 
 
 class XMLModelReport(ModelReport):
@@ -512,6 +1333,8 @@ class XMLModelReport(ModelReport):
             return dict2xml(self.data, roottag="report")
         elif isinstance(self.data, list):
             return list2xml(self.data, root="report", elementname="item")
+        elif isinstance(self.data, RowStore):
+            return list2xml(list(self.data), root="report", elementname="item")
         else:
             raise Exception("Data must be a list or dict")
 
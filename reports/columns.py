@@ -0,0 +1,298 @@
+"""
+Helpers for declaring report columns, for use as values within
+`ModelReport.get_field_lookups` or `CSVGenerator` fields.
+"""
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError
+import asyncio
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class MemoizedColumn(object):
+    """
+    A column callable whose value is cached by a key derived from the row
+    object, so an expensive computation over a handful of related objects is
+    only done once per distinct key during a run. The cache is a bounded LRU;
+    see `memoize`. ModelReport runs use copies of the column (see
+    `bind_columns`), so each run has a cache of its own.
+    """
+
+    def __init__(self, func, key, maxsize=1024):
+        self.func = func
+        self.key = key
+        self.maxsize = maxsize
+        self.__name__ = getattr(func, "__name__", self.__class__.__name__)
+        self.__doc__ = getattr(func, "__doc__", None)
+        self.cache_clear()
+
+    def __call__(self, obj):
+        key = self.key(obj) if callable(self.key) else getattr(obj, self.key)
+        value = self._cache.get(key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return value
+
+        self.misses += 1
+        value = self.func(obj)
+        self._cache[key] = value
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return value
+
+    def __get__(self, instance, owner):
+        # Support decorating methods of a ModelReport: each instance gets its
+        # own bound column, and so its own cache.
+        if instance is None:
+            return self
+        bound = self.copy(self.func.__get__(instance, owner))
+        instance.__dict__[self.__name__] = bound
+        return bound
+
+    def copy(self, func=None):
+        """
+        Return a copy of this column, with an empty cache of its own
+        """
+        return self.__class__(func or self.func, self.key, self.maxsize)
+
+    def cache_clear(self):
+        self._cache = OrderedDict()
+        self.hits = self.misses = 0
+
+    def cache_info(self):
+        calls = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / calls if calls else None,
+        }
+
+
+def memoize(func=None, key=None, maxsize=1024):
+    """
+    Cache the value of a column by `key` for the length of a report run.
+
+    `key`
+        Name of an attribute of the row object (e.g. "country_id"), or a
+        callable taking the row object, identifying rows sharing a value.
+    `maxsize`
+        The most values kept; the least recently used is dropped beyond it.
+
+    Use it inline, or as a decorator (including on ModelReport methods):
+
+    >>> ("Country", memoize(lambda o: str(o.country), key="country_id"))
+    >>> @memoize(key="agent_id")
+    >>> def agent_name(self, obj):
+    >>>     return obj.agent.get_full_name()
+    """
+    if key is None:
+        raise TypeError("memoize requires a key")
+    if func is None:
+        return lambda func: MemoizedColumn(func, key, maxsize)
+    return MemoizedColumn(func, key, maxsize)
+
+
+class IOBoundColumn(object):
+    """
+    A column callable which spends its time waiting on I/O, e.g. calling an
+    HTTP service or the storage backend. `ModelReport.collect_data` evaluates
+    such columns for a chunk of rows at a time in a thread pool of their own;
+    see `io_bound`. Called directly, it simply calls the wrapped function.
+    """
+
+    def __init__(self, func, max_workers=4, timeout=None, default=""):
+        self.func = func
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.default = default
+        self.__name__ = getattr(func, "__name__", self.__class__.__name__)
+        self.__doc__ = getattr(func, "__doc__", None)
+
+    def __call__(self, obj):
+        return self.func(obj)
+
+    async def acall(self, obj):
+        """
+        Evaluate the column in a worker thread, so the event loop is not
+        blocked while it waits, using `default` past the `timeout`
+        """
+        from asgiref.sync import sync_to_async
+
+        call = sync_to_async(self.func, thread_sensitive=False)(obj)
+        try:
+            return await asyncio.wait_for(call, self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Timed out evaluating column %s", self.__name__)
+            return self.default
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        bound = self.__class__(
+            self.func.__get__(instance, owner),
+            self.max_workers,
+            self.timeout,
+            self.default,
+        )
+        instance.__dict__[self.__name__] = bound
+        return bound
+
+
+def io_bound(func=None, max_workers=4, timeout=None, default=""):
+    """
+    Mark a column as I/O bound, so it is evaluated concurrently across rows.
+
+    `max_workers`
+        The most calls of this column in progress at once.
+    `timeout`
+        Seconds to wait for each value before giving up on it and using
+        `default` instead. Waits indefinitely if None.
+    `default`
+        The value of a row whose call timed out.
+
+    The wrapped callable runs outside the request thread, so it must be
+    thread safe and should not use the database. A call that times out
+    cannot be interrupted: it keeps its worker thread until it returns. The
+    workers are daemon threads, so a hung call does not keep the process
+    from exiting, but the callable should still time out on its own (e.g.
+    the `timeout` of an HTTP client) to free its worker.
+
+    >>> ("Download", io_bound(lambda o: storage.url(o.path), max_workers=8, timeout=5))
+    """
+    if func is None:
+        return lambda func: IOBoundColumn(func, max_workers, timeout, default)
+    return IOBoundColumn(func, max_workers, timeout, default)
+
+
+class DaemonThreadPool(object):
+    """
+    A minimal thread pool whose workers are daemon threads. Unlike those of
+    `concurrent.futures.ThreadPoolExecutor`, which are joined when the
+    interpreter exits, a worker stuck in a call that never returns does not
+    keep the process (e.g. `runreport` under cron) from exiting.
+    """
+
+    def __init__(self, max_workers):
+        self._queue = queue.Queue()
+        self._workers = [
+            threading.Thread(target=self._work, daemon=True)
+            for i in range(max_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, func, *args):
+        future = Future()
+        self._queue.put((future, func, args))
+        return future
+
+    def shutdown(self):
+        """
+        Stop the workers once they are done with the calls submitted so far,
+        without waiting for them
+        """
+        for worker in self._workers:
+            self._queue.put(None)
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, func, args = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = func(*args)
+            except BaseException as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+
+class IOColumnExecutor(object):
+    """
+    Evaluates I/O bound columns over chunks of rows, one thread pool per
+    column so each keeps to its own concurrency limit.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.pools = [DaemonThreadPool(column.max_workers) for field, column in columns]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def fill(self, objs, rows):
+        """
+        Set the value of each I/O bound column on `rows`, computed from the
+        matching object of `objs`. Row order is preserved.
+        """
+        # Submit every column first, so the columns also run concurrently
+        submitted = [
+            (field, column, [pool.submit(column.func, obj) for obj in objs])
+            for (field, column), pool in zip(self.columns, self.pools)
+        ]
+        for field, column, futures in submitted:
+            for row, future in zip(rows, futures):
+                try:
+                    row[field] = future.result(timeout=column.timeout)
+                except TimeoutError:
+                    # A call already running carries on in its worker
+                    future.cancel()
+                    logger.warning("Timed out evaluating column %s", field)
+                    row[field] = column.default
+
+    def shutdown(self):
+        for pool in self.pools:
+            pool.shutdown()
+
+
+def bind_columns(columns, bound):
+    """
+    Return the `(name, value)` pairs of `columns`, with each memoized column
+    replaced by a copy with a cache of its own. Copies are kept by column
+    name in the dict `bound`, so later calls with the same `bound` get the
+    same copies.
+    """
+    pairs = []
+    for name, value in columns:
+        if isinstance(value, MemoizedColumn):
+            entry = bound.get(name)
+            if entry is None or entry[0] is not value:
+                entry = bound[name] = (value, value.copy())
+            value = entry[1]
+        pairs.append((name, value))
+    return pairs
+
+
+def reset_columns(values):
+    """
+    Clear the caches of any memoized columns among `values`
+    """
+    for value in values:
+        if isinstance(value, MemoizedColumn):
+            value.cache_clear()
+
+
+def get_column_metrics(columns):
+    """
+    Return the cache statistics of the memoized columns among the
+    `(name, value)` pairs of `columns`, by column name.
+    """
+    return OrderedDict(
+        (name, value.cache_info())
+        for name, value in columns
+        if isinstance(value, MemoizedColumn)
+    )
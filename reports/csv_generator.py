@@ -3,6 +3,8 @@ import io
 import logging
 from collections import OrderedDict
 
+from .columns import get_column_metrics, reset_columns
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,18 +25,21 @@ class CSVGenerator(object):
     """
     def __init__(self, fields):
         self.fields = OrderedDict(fields)
+        self.metrics = {}
 
     def generate(self, objects):
         """
         `objects`
             The list of objects from which to generate the report
         """
+        reset_columns(self.fields.values())
         output = io.StringIO()
         csv_writer = csv.writer(output)
         csv_writer.writerow(self.fields)
         for obj in objects:
             data = self.get_row_data(obj)
             csv_writer.writerow([data[k] for k in self.fields.keys()])
+        self.metrics["columns"] = get_column_metrics(self.fields.items())
         return output.getvalue()
 
     def get_row_data(self, obj):
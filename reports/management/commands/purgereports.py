@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand
+
+from reports.retention import get_expired_reports, purge_reports
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete SavedReports, and their files, outside of the retention policy "
+        "set by the REPORTS_RETENTION_* settings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-age",
+            type=int,
+            help="Delete reports older than this many days. "
+            "Defaults to REPORTS_RETENTION_MAX_AGE.",
+        )
+        parser.add_argument(
+            "--max-count",
+            type=int,
+            help="Keep at most this many reports per report name. "
+            "Defaults to REPORTS_RETENTION_MAX_COUNT.",
+        )
+        parser.add_argument(
+            "--max-bytes",
+            type=int,
+            help="Keep at most this many bytes of report files in total. "
+            "Defaults to REPORTS_RETENTION_MAX_BYTES.",
+        )
+        parser.add_argument(
+            "--stale-age",
+            type=int,
+            help="Delete reports that never completed after this many hours. "
+            "Defaults to REPORTS_RETENTION_STALE_AGE.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of reports deleted per batch (default 500).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Number of storage calls made at once. "
+            "Defaults to REPORTS_RETENTION_WORKERS.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many reports would be deleted.",
+        )
+
+    def handle(self, *args, **options):
+        pks = get_expired_reports(
+            max_age=options["max_age"],
+            max_count=options["max_count"],
+            max_bytes=options["max_bytes"],
+            workers=options["workers"],
+            stale_age=options["stale_age"],
+        )
+        deleted = purge_reports(
+            pks,
+            batch_size=options["batch_size"],
+            workers=options["workers"],
+            dry_run=options["dry_run"],
+        )
+        if options["dry_run"]:
+            self.stdout.write("Would delete %s saved reports" % deleted)
+        else:
+            self.stdout.write("Deleted %s saved reports" % deleted)
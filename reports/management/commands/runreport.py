@@ -0,0 +1,248 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from reports.base import reports
+from reports.multi import MultiReportRunner
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run registered reports outside of the admin, saving them as "
+        "SavedReports or writing them to a file or stdout."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            metavar="report",
+            help="Name or class name of a registered report. Defaults to all "
+            "reports registered against --model.",
+        )
+        parser.add_argument(
+            "--model",
+            help="Run the reports registered against this model (app_label.Model). "
+            "Required for global reports.",
+        )
+        parser.add_argument(
+            "--filter",
+            action="append",
+            default=[],
+            dest="filters",
+            metavar="LOOKUP=VALUE",
+            help="Queryset filter, e.g. status=active or id__in=1,2,3. Repeatable.",
+        )
+        parser.add_argument(
+            "--pk-range",
+            metavar="START:END",
+            help="Inclusive range of primary keys to report on. Either end may be omitted.",
+        )
+        parser.add_argument(
+            "--user",
+            help="Username recorded as having run the reports.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of reports to run at once (default 1). Reports of the "
+            "same model always share a single scan of the database.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the output to this file, or into this directory when "
+            "running several reports, or to stdout with '-', instead of "
+            "creating SavedReports.",
+        )
+        parser.add_argument(
+            "--list",
+            action="store_true",
+            help="List the registered reports and exit.",
+        )
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            for model, report in reports.get_reports():
+                label = model._meta.label if model is not None else "(global)"
+                self.stdout.write(
+                    "{0}\t{1}\t{2}".format(label, report.name, report.__class__.__name__)
+                )
+            return
+
+        model = self.get_model(options["model"])
+        jobs = self.get_jobs(options["names"], model)
+        output = options["output"]
+        if output and output != "-" and len(jobs) > 1 and not os.path.isdir(output):
+            raise CommandError("--output must be a directory when running several reports")
+
+        user_id = self.get_user_id(options["user"])
+        queryset_options = (options["filters"], options["pk_range"])
+        lock = threading.Lock()
+
+        def run(group):
+            group_model, group_reports = group
+            queryset = self.get_queryset(group_model, *queryset_options)
+            if len(group_reports) == 1 and not output:
+                report = group_reports[0].__class__(queryset=queryset, user_id=user_id)
+                return [report.run_single_flight()]
+
+            # Reports of the same model share a single scan of the database
+            runner = MultiReportRunner(
+                [report.__class__ for report in group_reports],
+                queryset=queryset,
+                user_id=user_id,
+            )
+            if not output:
+                return runner.run_single_flight()
+            runner.collect()
+            for report in runner.reports:
+                content = report.generate_output()
+                with lock:
+                    self.write_output(report, content, output)
+            return []
+
+        def run_in_thread(group):
+            try:
+                return run(group)
+            finally:
+                connections.close_all()
+
+        groups = self.group_jobs(jobs)
+        if options["workers"] > 1:
+            with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+                results = [
+                    (group, executor.submit(run_in_thread, group)) for group in groups
+                ]
+                failed = self.collect_results(
+                    (group, future.result) for group, future in results
+                )
+        else:
+            failed = self.collect_results(
+                (group, lambda group=group: run(group)) for group in groups
+            )
+
+        if failed:
+            raise CommandError("Failed to run: %s" % ", ".join(failed))
+
+    def collect_results(self, results):
+        """
+        Report on each `(group, get_result)` pair, returning the names of the
+        reports that failed
+        """
+        failed = []
+        for (model, group_reports), get_result in results:
+            try:
+                saved_reports = get_result()
+            except Exception:
+                names = [report.name for report in group_reports]
+                logger.error("Failed to run reports %s", names, exc_info=True)
+                failed.extend(names)
+                continue
+            for saved_report in saved_reports:
+                if saved_report is None:
+                    continue
+                self.stderr.write(
+                    "{0}: saved report {1} ({2})".format(
+                        saved_report.report, saved_report.pk, saved_report.report_file.name
+                    )
+                )
+        return failed
+
+    def group_jobs(self, jobs):
+        """
+        Group the `(model, report)` pairs of `jobs` by model
+        """
+        groups = OrderedDict()
+        for model, report in jobs:
+            groups.setdefault(model, []).append(report)
+        return list(groups.items())
+
+    def get_model(self, label):
+        if not label:
+            return None
+        try:
+            return apps.get_model(label)
+        except (LookupError, ValueError) as exc:
+            raise CommandError(str(exc))
+
+    def get_jobs(self, names, model):
+        """
+        Return the `(model, report)` pairs to run
+        """
+        if not names and model is None:
+            raise CommandError("Name at least one report, or use --model")
+
+        jobs = []
+        for name in names or [None]:
+            # Global reports may be run against any model
+            matches = [
+                (report_model or model, report)
+                for report_model, report in reports.get_reports(
+                    name=name, model=model, include_global=True
+                )
+            ]
+            if not matches:
+                raise CommandError("No registered report matches %r" % (name or model))
+            for report_model, report in matches:
+                if report_model is None:
+                    raise CommandError(
+                        "%s is a global report, use --model to choose a model" % report.name
+                    )
+                jobs.append((report_model, report))
+        return jobs
+
+    def get_user_id(self, username):
+        if not username:
+            return None
+        User = get_user_model()
+        try:
+            return User._default_manager.get(**{User.USERNAME_FIELD: username}).pk
+        except User.DoesNotExist:
+            raise CommandError("Unknown user %r" % username)
+
+    def get_queryset(self, model, filters, pk_range):
+        queryset = model._default_manager.all()
+        lookups = {}
+        for spec in filters:
+            lookup, sep, value = spec.partition("=")
+            if not sep:
+                raise CommandError("Filters must look like LOOKUP=VALUE, got %r" % spec)
+            if lookup.endswith("__in"):
+                value = value.split(",")
+            elif lookup.endswith("__isnull"):
+                value = value.lower() in ("1", "true", "yes")
+            lookups[lookup] = value
+        if pk_range:
+            start, sep, end = pk_range.partition(":")
+            if not sep:
+                raise CommandError("--pk-range must look like START:END")
+            if start:
+                lookups["pk__gte"] = start
+            if end:
+                lookups["pk__lte"] = end
+        return queryset.filter(**lookups)
+
+    def write_output(self, report, content, output):
+        if output == "-":
+            if isinstance(content, bytes):
+                content = content.decode("utf-8")
+            self.stdout.write(content, ending="")
+            return
+
+        path = output
+        if os.path.isdir(output):
+            path = os.path.join(output, report.get_filename())
+        mode = "wb" if isinstance(content, bytes) else "w"
+        with open(path, mode) as f:
+            f.write(content)
+        self.stderr.write("{0}: wrote {1}".format(report.name, path))
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reports", "0002_auto_20210206_1635"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="savedreport",
+            name="watermark",
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reports", "0003_savedreport_watermark"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="savedreport",
+            name="rows_processed",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="savedreport",
+            name="rows_total",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="savedreport",
+            name="rows_per_second",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="savedreport",
+            name="date_completed",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reports", "0004_savedreport_progress"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="savedreport",
+            name="file_size",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="savedreport",
+            name="content_type",
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name="savedreport",
+            name="checksum",
+            field=models.CharField(blank=True, help_text="SHA-256", max_length=64),
+        ),
+        migrations.AlterIndexTogether(
+            name="savedreport",
+            index_together=set([("report", "date_created")]),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reports", "0005_savedreport_file_details"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="savedreport",
+            name="profile_file",
+            field=models.FileField(blank=True, upload_to="reports"),
+        ),
+        migrations.AddField(
+            model_name="savedreport",
+            name="profile_summary",
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reports", "0006_savedreport_profile"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="savedreport",
+            name="watermark_key",
+            field=models.CharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+    ]
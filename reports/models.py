@@ -1,3 +1,7 @@
+from datetime import timedelta
+import hashlib
+import mimetypes
+
 from django.conf import settings
 from django.db import models
 from django.urls import reverse
@@ -13,15 +17,78 @@ class SavedReport(models.Model):
     run_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, on_delete=models.SET_NULL)
     report_file = models.FileField(upload_to=REPORTS_FOLDER)
 
+    # Details of `report_file`, recorded when it is written so listing reports
+    # does not need to go to storage
+    file_size = models.BigIntegerField(null=True, blank=True)
+    content_type = models.CharField(max_length=100, blank=True)
+    checksum = models.CharField(max_length=64, blank=True, help_text='SHA-256')
+
+    # Profile of the run, when profiled (see ModelReport.profile)
+    profile_file = models.FileField(upload_to=REPORTS_FOLDER, blank=True)
+    profile_summary = models.TextField(blank=True)
+
+    # Highest value of the report's `incremental_field` covered by this run,
+    # and the report class and model it belongs to
+    watermark = models.CharField(max_length=255, null=True, blank=True)
+    watermark_key = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+
+    # Progress of the run, updated periodically while the report is running
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_total = models.PositiveIntegerField(null=True, blank=True)
+    rows_per_second = models.FloatField(null=True, blank=True)
+
     date_modified = models.DateTimeField(auto_now=True)
     date_created = models.DateTimeField(auto_now_add=True)
+    date_completed = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        index_together = [("report", "date_created")]
 
     def get_absolute_url(self):
         return reverse('admin:reports_savedreport_change', args=[self.id])
 
+    def get_progress(self):
+        """
+        Return the fraction of rows processed, if the total is known
+        """
+        if self.date_completed:
+            return 1.0
+        if not self.rows_total:
+            return None
+        return min(self.rows_processed / self.rows_total, 1.0)
+
+    def get_eta(self):
+        """
+        Return the estimated time of completion of a running report
+        """
+        if self.date_completed or not self.rows_total or not self.rows_per_second:
+            return None
+        remaining = max(self.rows_total - self.rows_processed, 0)
+        return self.date_modified + timedelta(
+            seconds=remaining / self.rows_per_second
+        )
+
     def save_file(self, content, filename):
         from django.core.files.base import ContentFile
+        raw = content.encode('utf-8') if isinstance(content, str) else content
+        self.file_size = len(raw)
+        self.checksum = hashlib.sha256(raw).hexdigest()
+        self.content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
         f = ContentFile(content)
         f.name = filename
         self.report_file = f
         self.save()
+
+    def save_profile(self, stats, summary, filename):
+        """
+        Attach the profile of the run: `stats` in the `.pstats` format (or
+        None), and its text `summary`
+        """
+        from django.core.files.base import ContentFile
+        self.profile_summary = summary
+        if stats is not None:
+            f = ContentFile(stats)
+            f.name = filename
+            self.profile_file = f
+        self.save()
@@ -0,0 +1,229 @@
+from contextlib import ExitStack
+import hashlib
+
+from .base import ModelReport
+from .columns import IOColumnExecutor
+from .models import SavedReport
+from .progress import ProgressTracker
+from .singleflight import single_flight
+
+
+class MultiReportRunner(object):
+    """
+    Runs several reports of the same model over a single scan of the database.
+
+    The queryset is iterated once, with the related joins of every report
+    merged, and each row is handed to the `get_row_data` of every report
+    whose selection contains it. Each report then generates and saves its
+    own output, producing one SavedReport per report.
+
+    >>> runner = MultiReportRunner([OrdersReport, InvoicesReport], queryset=qs)
+    >>> saved_reports = runner.run()
+
+    Reports which override `collect_data` build their rows in their own way,
+    so they cannot share the scan and collect their data on their own.
+
+    The progress of the shared scan is recorded on the SavedReport of every
+    report sharing it.
+    """
+
+    def __init__(self, report_classes, queryset=None, user_id=None):
+        kwargs = {"user_id": user_id}
+        if queryset is not None:
+            kwargs["queryset"] = queryset
+        self.reports = [report_class(**kwargs) for report_class in report_classes]
+
+        models = {report.get_model() for report in self.reports}
+        if len(models) > 1:
+            raise ValueError("Reports sharing a scan must share a model")
+
+    def run(self):
+        """
+        Run every report, returning their SavedReports in order
+        """
+        for report in self.reports:
+            report.start_saved_report()
+        saved_reports = []
+        try:
+            self.collect()
+            for report in self.reports:
+                saved_reports.append(report.complete_report())
+        except Exception:
+            for report in self.reports[len(saved_reports):]:
+                report.discard_saved_report()
+            raise
+        return saved_reports
+
+    def get_single_flight_key(self):
+        """
+        Return the key identifying identical runs of these reports, or None
+        if any of them does not coalesce its runs
+        """
+        keys = []
+        for report in self.reports:
+            key = report.get_single_flight_key() if report.single_flight else None
+            if key is None:
+                return None
+            keys.append(key)
+        return hashlib.sha1("|".join(keys).encode("utf-8")).hexdigest()
+
+    def run_single_flight(self):
+        """
+        Run every report through `run`, unless an identical run of the same
+        reports is already in progress, in which case wait for it and return
+        its SavedReports.
+        """
+        key = self.get_single_flight_key()
+        if key is None:
+            return self.run()
+
+        # Keep hold of the leader's instances; followers receive the pks
+        result = {}
+
+        def run():
+            result["saved_reports"] = self.run()
+            return [saved_report.pk for saved_report in result["saved_reports"]]
+
+        timeouts = [report.single_flight_timeout for report in self.reports]
+        timeout = max(timeouts) if None not in timeouts else None
+        waits = [report.single_flight_wait for report in self.reports]
+        wait = max(waits) if None not in waits else None
+        pks = single_flight(key, run, timeout=timeout, wait=wait)
+        if "saved_reports" in result:
+            return result["saved_reports"]
+        saved_reports = SavedReport.objects.in_bulk(pks)
+        return [saved_reports[pk] for pk in pks]
+
+    def collect(self):
+        """
+        Collect the data of every report, sharing the scan where possible
+        """
+        shared = [report for report in self.reports if self.can_share_scan(report)]
+        self.collect_data(shared)
+        for report in self.reports:
+            if report not in shared:
+                report.collect_data()
+
+    def can_share_scan(self, report):
+        return type(report).collect_data is ModelReport.collect_data
+
+    def collect_data(self, reports):
+        """
+        Collect the data of every report in `reports` from one queryset scan
+        """
+        if not reports:
+            return
+        queryset, routes = self.get_queryset(reports)
+
+        for report in reports:
+            report.reset_data()
+            report.clear_column_caches()
+
+        try:
+            with ExitStack() as stack:
+                # Rows of reports with I/O bound columns wait in chunks for
+                # the values of those columns, as in `collect_io_data`
+                pending = {}
+                for report in reports:
+                    io_columns = report.get_io_columns()
+                    if io_columns:
+                        executor = stack.enter_context(IOColumnExecutor(io_columns))
+                        pending[report] = (executor, [], [])
+                        report._defer_io_columns = True
+                        stack.callback(setattr, report, "_defer_io_columns", False)
+
+                for obj in self.track_progress(queryset, reports):
+                    for report, pks in routes:
+                        if pks is not None and obj.pk not in pks:
+                            continue
+                        row = report.get_row_data(obj)
+                        if report not in pending:
+                            report.add_row(row)
+                            continue
+                        executor, objs, rows = pending[report]
+                        objs.append(obj)
+                        rows.append(row)
+                        if len(rows) >= report.io_chunk_size:
+                            self.fill_io_columns(report, executor, objs, rows)
+
+                for report, (executor, objs, rows) in pending.items():
+                    self.fill_io_columns(report, executor, objs, rows)
+
+            for report in reports:
+                report.metrics["columns"] = report.get_run_column_metrics()
+                report.metrics["shared_scan"] = len(reports)
+        finally:
+            for report in reports:
+                report.clear_column_caches()
+
+    def fill_io_columns(self, report, executor, objs, rows):
+        """
+        Evaluate the I/O bound columns of the pending `rows` of `report`,
+        then add them to its data
+        """
+        executor.fill(objs, rows)
+        for row in rows:
+            report.add_row(row)
+        del objs[:]
+        del rows[:]
+
+    def track_progress(self, queryset, reports):
+        """
+        Wrap the iteration over the shared `queryset` in a single
+        ProgressTracker, which records the progress of the scan on the
+        SavedReport of each of `reports` following progress
+        """
+        tracked = [
+            report
+            for report in reports
+            if report.progress and report.saved_report is not None
+        ]
+        if not tracked:
+            return queryset
+        tracker = ProgressTracker(
+            *[report.saved_report for report in tracked],
+            total=tracked[0].estimate_total(queryset)
+        )
+        for report in tracked:
+            report.progress_tracker = tracker
+        return tracker.track(queryset)
+
+    def get_queryset(self, reports):
+        """
+        Return the queryset to scan, along with a `(report, pks)` pair per
+        report. `pks` holds the primary keys of the rows selected by that
+        report, or is None when the report selects every row of the scan.
+        """
+        # Joins are merged separately, see `merge_select_related`
+        querysets = [report.get_queryset().select_related(None) for report in reports]
+        try:
+            queries = {str(qs.query) for qs in querysets}
+        except Exception:
+            # e.g. EmptyResultSet; fall back to routing rows by pk
+            queries = None
+
+        queryset = querysets[0]
+        if queries is not None and len(queries) == 1:
+            routes = [(report, None) for report in reports]
+        else:
+            # The selections differ: scan their union, and route each row to
+            # the reports that selected it through a cheap pk-only query.
+            for qs in querysets[1:]:
+                queryset = queryset | qs
+            routes = [
+                (report, set(qs.values_list("pk", flat=True)))
+                for report, qs in zip(reports, querysets)
+            ]
+
+        return self.merge_select_related(queryset, reports), routes
+
+    def merge_select_related(self, queryset, reports):
+        related = set()
+        for report in reports:
+            if report.select_related is True:
+                return queryset.select_related()
+            elif report.select_related:
+                related.update(report.select_related)
+        if related:
+            return queryset.select_related(*sorted(related))
+        return queryset
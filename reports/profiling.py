@@ -0,0 +1,137 @@
+"""
+Profiling of report runs, see `ModelReport.profile`.
+"""
+from collections import Counter
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import sys
+import threading
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Profile every report run, unless the report sets `profile` itself
+REPORTS_PROFILE = getattr(settings, "REPORTS_PROFILE", False)
+
+# "cprofile" for deterministic profiling, or "sampling" for a lighter,
+# statistical profile of where the run spends its time
+REPORTS_PROFILE_MODE = getattr(settings, "REPORTS_PROFILE_MODE", "cprofile")
+
+# Number of functions listed in the text summary
+REPORTS_PROFILE_TOP = getattr(settings, "REPORTS_PROFILE_TOP", 40)
+
+# If True, each registered report also gets a "(profile)" admin action,
+# which is only shown to superusers
+REPORTS_PROFILE_ACTIONS = getattr(settings, "REPORTS_PROFILE_ACTIONS", False)
+
+
+class ReportProfiler(object):
+    """
+    Profiles the code run within it, in the current thread.
+
+    >>> with ReportProfiler() as profiler:
+    >>>     report.run_report()
+    >>> profiler.get_summary()
+    """
+
+    def __init__(self, mode=None, top=None, interval=0.005):
+        self.mode = mode or REPORTS_PROFILE_MODE
+        self.top = top or REPORTS_PROFILE_TOP
+        self.interval = interval
+        self.profile = None
+        self.samples = Counter()
+        self.own_samples = Counter()
+        self.sample_count = 0
+
+    def __enter__(self):
+        if self.mode == "sampling":
+            self._start_sampling()
+        else:
+            self.profile = cProfile.Profile()
+            try:
+                self.profile.enable()
+            except ValueError:
+                # Another profiler is already active in this thread
+                logger.warning("Could not profile report", exc_info=True)
+                self.profile = None
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.mode == "sampling":
+            self._stop_sampling()
+        elif self.profile is not None:
+            self.profile.disable()
+
+    def get_stats(self):
+        """
+        Return the profile in the binary `.pstats` format, as read by
+        `pstats.Stats`, or None for a sampling profile.
+        """
+        if self.profile is None:
+            return None
+        self.profile.create_stats()
+        return marshal.dumps(self.profile.stats)
+
+    def get_summary(self):
+        """
+        Return a text summary of the functions taking the most time
+        """
+        if self.mode == "sampling":
+            return self._get_sampling_summary()
+        if self.profile is None:
+            return ""
+        output = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=output)
+        stats.sort_stats("cumulative").print_stats(self.top)
+        return output.getvalue()
+
+    def _start_sampling(self):
+        self._thread_id = threading.get_ident()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+
+    def _stop_sampling(self):
+        self._stop.set()
+        self._sampler.join()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            self.sample_count += 1
+            self.own_samples[self._describe(frame)] += 1
+            seen = set()
+            while frame is not None:
+                function = self._describe(frame)
+                if function not in seen:
+                    seen.add(function)
+                    self.samples[function] += 1
+                frame = frame.f_back
+
+    def _describe(self, frame):
+        code = frame.f_code
+        return "%s:%s(%s)" % (code.co_filename, code.co_firstlineno, code.co_name)
+
+    def _get_sampling_summary(self):
+        total = self.sample_count or 1
+        lines = [
+            "%s samples, one every %ss" % (self.sample_count, self.interval),
+            "",
+            "%8s %8s  function" % ("total%", "own%"),
+        ]
+        for function, count in self.samples.most_common(self.top):
+            lines.append(
+                "%7.1f%% %7.1f%%  %s"
+                % (
+                    100.0 * count / total,
+                    100.0 * self.own_samples[function] / total,
+                    function,
+                )
+            )
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,156 @@
+"""
+Retention policy for SavedReports and their files.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import logging
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import SavedReport
+
+logger = logging.getLogger(__name__)
+
+# Days after which a SavedReport expires
+REPORTS_RETENTION_MAX_AGE = getattr(settings, "REPORTS_RETENTION_MAX_AGE", None)
+
+# Most SavedReports kept per report name; older ones expire first
+REPORTS_RETENTION_MAX_COUNT = getattr(settings, "REPORTS_RETENTION_MAX_COUNT", None)
+
+# Most bytes of report files kept in total; older ones expire first
+REPORTS_RETENTION_MAX_BYTES = getattr(settings, "REPORTS_RETENTION_MAX_BYTES", None)
+
+# Hours after which a SavedReport that never completed, e.g. because the
+# process running it died, expires
+REPORTS_RETENTION_STALE_AGE = getattr(settings, "REPORTS_RETENTION_STALE_AGE", 24)
+
+# Number of storage calls made at once while purging
+REPORTS_RETENTION_WORKERS = getattr(settings, "REPORTS_RETENTION_WORKERS", 8)
+
+
+def get_storage():
+    return SavedReport._meta.get_field("report_file").storage
+
+
+def get_expired_reports(
+    max_age=None, max_count=None, max_bytes=None, workers=None, stale_age=None
+):
+    """
+    Return the pks of the SavedReports outside of the retention policy,
+    oldest first. Each limit defaults to its REPORTS_RETENTION_* setting; a
+    limit of None is not enforced.
+    """
+    max_age = REPORTS_RETENTION_MAX_AGE if max_age is None else max_age
+    max_count = REPORTS_RETENTION_MAX_COUNT if max_count is None else max_count
+    max_bytes = REPORTS_RETENTION_MAX_BYTES if max_bytes is None else max_bytes
+    stale_age = REPORTS_RETENTION_STALE_AGE if stale_age is None else stale_age
+
+    expired = set()
+    if max_age is not None:
+        cutoff = timezone.now() - timedelta(days=max_age)
+        expired.update(
+            SavedReport.objects.filter(date_created__lt=cutoff).values_list(
+                "pk", flat=True
+            )
+        )
+
+    if stale_age is not None:
+        # Created by a run that never completed, and has no file
+        cutoff = timezone.now() - timedelta(hours=stale_age)
+        expired.update(
+            SavedReport.objects.filter(
+                report_file="", date_completed=None, date_created__lt=cutoff
+            ).values_list("pk", flat=True)
+        )
+
+    # Reports still running have no file yet, and are left alone
+    completed = SavedReport.objects.exclude(report_file="").order_by(
+        "-date_created", "-pk"
+    )
+
+    if max_count is not None:
+        names = completed.order_by().values_list("report", flat=True).distinct()
+        for name in names:
+            expired.update(
+                completed.filter(report=name).values_list("pk", flat=True)[max_count:]
+            )
+
+    if max_bytes is not None:
+        remaining = [
+            row
+            for row in completed.values_list("pk", "report_file", "file_size")
+            if row[0] not in expired
+        ]
+        # Sizes are stored on the row when the file is written; only reports
+        # saved before that was the case need a trip to storage.
+        unknown = [name for pk, name, size in remaining if size is None]
+        fetched = iter(get_file_sizes(unknown, workers=workers)) if unknown else None
+        total = 0
+        for pk, name, size in remaining:
+            total += next(fetched) if size is None else size
+            if total > max_bytes:
+                expired.add(pk)
+
+    return sorted(expired)
+
+
+def get_file_sizes(names, workers=None):
+    """
+    Return the size of each of the files `names`, fetched from storage
+    concurrently. Missing files count as empty.
+    """
+    storage = get_storage()
+
+    def size(name):
+        try:
+            return storage.size(name)
+        except (IOError, OSError):
+            return 0
+
+    with ThreadPoolExecutor(max_workers=workers or REPORTS_RETENTION_WORKERS) as executor:
+        return list(executor.map(size, names))
+
+
+def purge_reports(pks, batch_size=500, workers=None, dry_run=False):
+    """
+    Delete the SavedReports `pks` and their files (including any profile),
+    in batches of `batch_size`.
+    The files of each batch are removed from storage concurrently, by at most
+    `workers` threads, and only reports whose file could be removed are
+    deleted. Returns the number of reports deleted (or that would be, when
+    `dry_run` is set).
+    """
+    storage = get_storage()
+    deleted = 0
+
+    def delete_file(name):
+        if not name:
+            return True
+        try:
+            storage.delete(name)
+            return True
+        except Exception:
+            logger.error("Failed to delete report file %s", name, exc_info=True)
+            return False
+
+    with ThreadPoolExecutor(max_workers=workers or REPORTS_RETENTION_WORKERS) as executor:
+        for start in range(0, len(pks), batch_size):
+            batch = list(
+                SavedReport.objects.filter(
+                    pk__in=pks[start:start + batch_size]
+                ).values_list("pk", "report_file", "profile_file")
+            )
+            if dry_run:
+                deleted += len(batch)
+                continue
+
+            names = [name for row in batch for name in row[1:]]
+            results = iter(executor.map(delete_file, names))
+            removed = [
+                row[0] for row in batch if all([next(results) for name in row[1:]])
+            ]
+            SavedReport.objects.filter(pk__in=removed).delete()
+            deleted += len(removed)
+
+    return deleted
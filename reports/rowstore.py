@@ -0,0 +1,216 @@
+"""
+A store for collected report rows which keeps memory use within a budget.
+"""
+from collections import OrderedDict
+import heapq
+import pickle
+import sys
+import tempfile
+
+from django.conf import settings
+
+from .schema import Schema
+
+# Default memory budget, in bytes, of `ModelReport.collect_data`. None keeps
+# every row in a plain list.
+REPORTS_DATA_MEMORY_BUDGET = getattr(settings, "REPORTS_DATA_MEMORY_BUDGET", None)
+
+
+class _Missing(object):
+    """
+    Marks a column absent from a row. Pickles by reference, so it is still
+    the same object once read back from disk.
+    """
+
+    def __reduce__(self):
+        return "MISSING"
+
+    def __repr__(self):
+        return "MISSING"
+
+
+MISSING = _Missing()
+
+
+class RowStore(object):
+    """
+    Holds row dicts as compact tuples, indexed by a shared schema of column
+    names, in memory until their estimated size exceeds `memory_budget` bytes.
+    Beyond that, rows are spilled to a temporary file in pickled blocks.
+
+    The store iterates as a list of OrderedDicts would, so code written
+    against a list of rows (e.g. `for row in self.data`) keeps working at any
+    size. Keys of each row come back in schema order, i.e. the order in which
+    columns were first seen.
+
+    >>> store = RowStore(memory_budget=64 * 1024 * 1024)
+    >>> store.append(OrderedDict([("Id", 1), ("Name", "Name 1")]))
+    >>> store.sort(key=lambda row: row["Name"])
+    >>> for row in store:
+    >>>     ...
+    """
+
+    # Number of rows pickled together when spilling to disk
+    block_size = 1000
+
+    def __init__(self, memory_budget):
+        self.memory_budget = memory_budget
+        # The columns seen so far, and their position within each row tuple
+        self.columns = Schema()
+        self._rows = []
+        self._bytes = 0
+        self._len = 0
+        # Each run is a list of the offsets of its blocks within `_file`
+        self._runs = []
+        self._file = None
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    def __iter__(self):
+        for row in self._iter_tuples():
+            yield self._to_dict(row)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def append(self, row):
+        columns = self.columns
+        columns.update(row)
+        values = [MISSING] * len(columns)
+        for key, value in row.items():
+            values[columns.index(key)] = value
+        values = tuple(values)
+
+        self._rows.append(values)
+        self._len += 1
+        self._bytes += self._get_size(values)
+        if self._bytes > self.memory_budget:
+            self._spill()
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def sort(self, key=None, reverse=False):
+        """
+        Sort the rows in place, as `list.sort` would. Rows spilled to disk are
+        sorted with an external merge sort, holding at most the memory budget
+        plus one block per sorted run in memory.
+        """
+
+        def tuple_key(row):
+            row = self._to_dict(row)
+            return row if key is None else key(row)
+
+        self._sort_rows(self._rows, tuple_key, reverse)
+        if not self._runs:
+            return
+
+        # Split the spilled rows into sorted runs which each fit within the
+        # budget (a run may be larger, e.g. the result of a previous sort),
+        # then merge the sorted runs and the rows in memory into a new run.
+        runs = []
+        for blocks in self._runs:
+            runs.extend(self._sort_run(blocks, tuple_key, reverse))
+        source = self._file
+        merged = heapq.merge(
+            *[self._iter_run(blocks, source) for blocks in runs] + [iter(self._rows)],
+            key=tuple_key,
+            reverse=reverse
+        )
+
+        # Write the merged run to a new file, dropping the old one after
+        self._file = None
+        self._runs = [self._write_run(merged)]
+        source.close()
+        self._rows = []
+        self._bytes = 0
+
+    def close(self):
+        """
+        Discard the rows, removing any temporary file
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._rows, self._runs = [], []
+        self._bytes = self._len = 0
+
+    def _sort_run(self, blocks, tuple_key, reverse):
+        """
+        Read the run `blocks` a budget's worth of rows at a time, writing each
+        part back sorted, and return the sorted runs
+        """
+        runs, rows, size = [], [], 0
+        for row in self._iter_run(blocks):
+            rows.append(row)
+            size += self._get_size(row)
+            if size > self.memory_budget:
+                self._sort_rows(rows, tuple_key, reverse)
+                runs.append(self._write_run(rows))
+                rows, size = [], 0
+        if rows:
+            self._sort_rows(rows, tuple_key, reverse)
+            runs.append(self._write_run(rows))
+        return runs
+
+    def _sort_rows(self, rows, tuple_key, reverse):
+        rows.sort(key=tuple_key, reverse=reverse)
+
+    def _get_size(self, row):
+        """
+        Estimate the bytes of memory held by the row tuple `row`
+        """
+        return sys.getsizeof(row) + sum(map(sys.getsizeof, row))
+
+    def _to_dict(self, row):
+        return OrderedDict(
+            (key, row[index])
+            for key, index in self.columns.items()
+            if index < len(row) and row[index] is not MISSING
+        )
+
+    def _iter_tuples(self):
+        for blocks in self._runs:
+            for row in self._iter_run(blocks):
+                yield row
+        for row in self._rows:
+            yield row
+
+    def _iter_run(self, blocks, source=None):
+        f = source if source is not None else self._file
+        for offset in blocks:
+            f.seek(offset)
+            for row in pickle.load(f):
+                yield row
+
+    def _write_run(self, rows):
+        """
+        Write `rows` to the temporary file in blocks, returning their offsets
+        """
+        if self._file is None:
+            self._file = tempfile.TemporaryFile()
+        blocks, block = [], []
+        for row in rows:
+            block.append(row)
+            if len(block) == self.block_size:
+                blocks.append(self._write_block(block))
+                block = []
+        if block:
+            blocks.append(self._write_block(block))
+        return blocks
+
+    def _write_block(self, block):
+        self._file.seek(0, 2)
+        offset = self._file.tell()
+        pickle.dump(block, self._file, pickle.HIGHEST_PROTOCOL)
+        return offset
+
+    def _spill(self):
+        self._runs.append(self._write_run(self._rows))
+        self._rows = []
+        self._bytes = 0
@@ -0,0 +1,66 @@
+from collections import OrderedDict
+
+
+class Schema(object):
+    """
+    The ordered set of column names found across rows of data, in the order
+    they were first seen. Membership is a dict lookup, so building the schema
+    of many rows costs one pass over their keys.
+
+    Each column is numbered by position, for storing rows as tuples (see
+    `RowStore`).
+
+    >>> schema = Schema(["Id"])
+    >>> schema.update({"Id": 1, "Name": "Name 1"})
+    >>> list(schema)
+    ['Id', 'Name']
+    """
+
+    def __init__(self, fields=()):
+        # Column name -> position
+        self._fields = OrderedDict()
+        for field in fields:
+            self.add(field)
+
+    @classmethod
+    def from_rows(cls, rows):
+        schema = cls()
+        for row in rows:
+            schema.update(row)
+        return schema
+
+    def add(self, field):
+        """
+        Add `field` if new, returning its position
+        """
+        index = self._fields.get(field)
+        if index is None:
+            index = self._fields[field] = len(self._fields)
+        return index
+
+    def update(self, row):
+        """
+        Add the keys of `row` which are new
+        """
+        fields = self._fields
+        for key in row:
+            if key not in fields:
+                fields[key] = len(fields)
+
+    def index(self, field):
+        return self._fields[field]
+
+    def items(self):
+        """
+        Return `(name, position)` pairs
+        """
+        return self._fields.items()
+
+    def __contains__(self, field):
+        return field in self._fields
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
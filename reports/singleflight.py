@@ -0,0 +1,136 @@
+"""
+Single-flight coalescing of identical report runs.
+
+While a run for a given key is in flight, any other caller using the same key
+waits for that run to finish and receives its result instead of repeating the
+work. Coordination happens through the Django cache, so it spans every
+process (and host) sharing the configured cache backend. The default
+``LocMemCache`` is per-process, and ``DummyCache`` stores nothing, so with
+those runs are only coalesced within one process, or not at all, and a
+warning is logged; use a shared backend (memcached, redis, database cache) to
+coalesce across workers and nodes.
+"""
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+logger = logging.getLogger(__name__)
+
+REPORTS_CACHE = getattr(settings, "REPORTS_CACHE", "default")
+REPORTS_SINGLE_FLIGHT_TIMEOUT = getattr(
+    settings, "REPORTS_SINGLE_FLIGHT_TIMEOUT", 60 * 60
+)
+# Longest a caller waits for a run in flight. Defaults to the lock timeout.
+REPORTS_SINGLE_FLIGHT_WAIT = getattr(settings, "REPORTS_SINGLE_FLIGHT_WAIT", None)
+REPORTS_SINGLE_FLIGHT_POLL_INTERVAL = getattr(
+    settings, "REPORTS_SINGLE_FLIGHT_POLL_INTERVAL", 0.5
+)
+
+# How long a finished result stays available to followers that have not yet
+# picked it up.
+RESULT_TTL = 60
+
+KEY_PREFIX = "reports:single-flight"
+
+# Cache backends that cannot coordinate runs across processes
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+# Aliases already warned about being process-local
+_warned = set()
+
+
+class SingleFlightTimeout(Exception):
+    pass
+
+
+def single_flight(key, func, timeout=None, poll_interval=None, wait=None):
+    """
+    Run `func` unless an identical run (same `key`) is already in flight, in
+    which case wait for it and return its result.
+
+    `key`
+        Identifies the work. Callers with equal keys are coalesced.
+    `func`
+        Callable without arguments. Its return value must be picklable, as it
+        is handed to followers through the cache.
+    `timeout`
+        Seconds the lock is held for at most, after which it expires even if
+        the run is still going, e.g. because its process died.
+    `poll_interval`
+        Seconds between cache polls while following another run.
+    `wait`
+        The longest a follower waits, in seconds, before raising
+        `SingleFlightTimeout`. Defaults to `timeout`.
+    """
+    cache = caches[REPORTS_CACHE]
+    _check_cache(cache)
+    timeout = timeout or REPORTS_SINGLE_FLIGHT_TIMEOUT
+    poll_interval = poll_interval or REPORTS_SINGLE_FLIGHT_POLL_INTERVAL
+    wait = wait or REPORTS_SINGLE_FLIGHT_WAIT or timeout
+    lock_key = "%s:lock:%s" % (KEY_PREFIX, key)
+    deadline = time.monotonic() + wait
+
+    while True:
+        token = uuid.uuid4().hex
+        if cache.add(lock_key, token, timeout):
+            # Leader: run the work and publish the result for followers
+            try:
+                result = func()
+                cache.set(_result_key(key, token), (result,), RESULT_TTL)
+                return result
+            finally:
+                # The lock may have expired mid-run and been taken by another
+                # leader, whose lock must be left alone
+                if cache.get(lock_key) == token:
+                    cache.delete(lock_key)
+
+        # Follower: attach to the run currently holding the lock
+        leader_token = cache.get(lock_key)
+        if leader_token is not None:
+            logger.debug("Attaching to in-flight report run %s", key)
+            result_key = _result_key(key, leader_token)
+            while True:
+                found = cache.get(result_key)
+                if found is not None:
+                    return found[0]
+                if cache.get(lock_key) != leader_token:
+                    # The leader finished (check its result one last time) or
+                    # failed, in which case we compete for the lock again.
+                    found = cache.get(result_key)
+                    if found is not None:
+                        return found[0]
+                    break
+                if time.monotonic() >= deadline:
+                    raise SingleFlightTimeout(
+                        "Timed out waiting for in-flight run of %s" % key
+                    )
+                time.sleep(poll_interval)
+
+        if time.monotonic() >= deadline:
+            raise SingleFlightTimeout("Timed out waiting for run of %s" % key)
+
+
+def _check_cache(cache):
+    """
+    Warn, once per cache alias, when `cache` cannot coalesce runs across
+    processes
+    """
+    if REPORTS_CACHE in _warned or not isinstance(cache, PROCESS_LOCAL_CACHES):
+        return
+    _warned.add(REPORTS_CACHE)
+    logger.warning(
+        "The %r cache (%s) is not shared between processes, so identical "
+        "report runs are not coalesced across them; set REPORTS_CACHE to a "
+        "shared cache backend",
+        REPORTS_CACHE,
+        cache.__class__.__name__,
+    )
+
+
+def _result_key(key, token):
+    return "%s:result:%s:%s" % (KEY_PREFIX, key, token)
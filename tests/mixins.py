@@ -0,0 +1,26 @@
+import shutil
+import tempfile
+
+
+class SavedReportMixin(object):
+    """
+    Saves report files to a temporary MEDIA_ROOT, removed after each test
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings = self.settings(MEDIA_ROOT=self.media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def read(self, saved_report):
+        """
+        Return the content of the file of `saved_report`, as text
+        """
+        saved_report.report_file.open("rb")
+        try:
+            return saved_report.report_file.read().decode("utf-8")
+        finally:
+            saved_report.report_file.close()
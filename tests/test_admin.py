@@ -0,0 +1,49 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from reports.models import SavedReport
+
+from .mixins import SavedReportMixin
+
+
+class SavedReportAdminTest(SavedReportMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(self.user)
+        for i in range(3):
+            saved = SavedReport.objects.create(report="Report %s" % i, run_by=self.user)
+            saved.save_file("x" * 2048, "report.csv")
+
+    def test_changelist_uses_stored_details(self):
+        """
+        The changelist should display and filter without going to storage
+        """
+        storage = SavedReport._meta.get_field("report_file").storage
+        with mock.patch.object(storage, "size", side_effect=AssertionError):
+            response = self.client.get(
+                "/admin/reports/savedreport/?file_size=small&content_type=csv"
+            )
+        assert response.status_code == 200
+        assert b"2.0\xc2\xa0KB" in response.content
+        assert response.context["cl"].result_count == 3
+
+    def test_content_type_filter(self):
+        """
+        The content type filter should offer fixed choices, without querying
+        the distinct values of the column
+        """
+        saved = SavedReport.objects.create(report="XML", run_by=self.user)
+        saved.save_file("<xml/>", "report.xml")
+        url = "/admin/reports/savedreport/?content_type="
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url + "xml")
+        assert response.context["cl"].result_count == 1
+        assert not [q for q in queries if "DISTINCT" in q["sql"].upper()]
+        assert self.client.get(url + "csv").context["cl"].result_count == 3
+        assert self.client.get(url + "other").context["cl"].result_count == 0
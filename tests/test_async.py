@@ -0,0 +1,131 @@
+import ast
+from collections import OrderedDict
+import os
+import sys
+from unittest import mock, skipIf
+
+from asgiref.sync import async_to_sync
+import django
+from django.test import SimpleTestCase, TestCase
+
+from reports.base import ModelReport
+
+from .mixins import SavedReportMixin
+from .testapp.models import ReportTestModel
+
+
+async def shout(obj):
+    return obj.name.upper()
+
+
+async def consume(aiterable):
+    items = []
+    async for item in aiterable:
+        items.append(item)
+    return items
+
+
+class AsyncReport(ModelReport):
+    name = "Async"
+    queryset = ReportTestModel.objects.all()
+    async_chunk_size = 1
+    field_lookups = [
+        ("Name", "name"),
+        ("Shout", shout),
+    ]
+
+
+class AsyncModelReportTest(SavedReportMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        ReportTestModel.objects.create(name="Name 1")
+        ReportTestModel.objects.create(name="Name 2")
+
+    def test_acollect_data(self):
+        """
+        Coroutine columns should be awaited
+        """
+        report = AsyncReport()
+        assert async_to_sync(report.acollect_data)() == [
+            OrderedDict([("Name", "Name 1"), ("Shout", "NAME 1")]),
+            OrderedDict([("Name", "Name 2"), ("Shout", "NAME 2")]),
+        ]
+
+    def test_acollect_data_resolves_lookups_once(self):
+        """
+        The field lookups should be resolved once per run, not once per row
+        """
+        report = AsyncReport()
+        with mock.patch.object(
+            report, "get_run_field_lookups", wraps=report.get_run_field_lookups
+        ) as get_run_field_lookups:
+            async_to_sync(report.acollect_data)()
+        assert get_run_field_lookups.call_count == 1
+
+    def test_astream_csv(self):
+        """
+        Should stream the header then a line per row
+        """
+        report = AsyncReport()
+        assert async_to_sync(consume)(report.astream_csv()) == [
+            "Name,Shout\r\n",
+            "Name 1,NAME 1\r\n",
+            "Name 2,NAME 2\r\n",
+        ]
+
+    @skipIf(django.VERSION < (4, 2), "Async streaming requires Django 4.2")
+    def test_astreaming_response(self):
+        """
+        The response should stream the CSV asynchronously
+        """
+        response = AsyncReport().astreaming_response()
+        assert response.is_async
+        assert b"".join(async_to_sync(consume)(response)) == (
+            b"Name,Shout\r\nName 1,NAME 1\r\nName 2,NAME 2\r\n"
+        )
+        assert response["Content-Type"] == "text/csv"
+
+    @skipIf(django.VERSION >= (4, 2), "Async streaming requires Django 4.2")
+    def test_astreaming_response_fallback(self):
+        """
+        Before Django 4.2, the response should stream the CSV synchronously
+        """
+
+        class SyncReport(AsyncReport):
+            field_lookups = [("Name", "name")]
+
+        response = SyncReport().astreaming_response()
+        assert b"".join(response) == b"Name\r\nName 1\r\nName 2\r\n"
+        assert response["Content-Type"] == "text/csv"
+        assert "attachment" in response["Content-Disposition"]
+
+    def test_arun_report(self):
+        """
+        Should save the report like run_report
+        """
+        saved = async_to_sync(AsyncReport().arun_report)()
+        assert self.read(saved) == "Name,Shout\r\nName 1,NAME 1\r\nName 2,NAME 2\r\n"
+        assert saved.rows_processed == 2
+
+
+class Python35SyntaxTest(SimpleTestCase):
+    @skipIf(sys.version_info < (3, 8), "ast.parse(feature_version) needs 3.8")
+    def test_modules_parse(self):
+        """
+        Only `reports.aio`, which is imported lazily, may use the async
+        generators and other syntax Python 3.5 does not parse
+        """
+        import reports
+
+        package = os.path.dirname(reports.__file__)
+        for name in os.listdir(package):
+            if not name.endswith(".py") or name == "aio.py":
+                continue
+            with open(os.path.join(package, name)) as f:
+                tree = ast.parse(f.read(), name, feature_version=(3, 5))
+            for node in ast.walk(tree):
+                if isinstance(node, ast.AsyncFunctionDef):
+                    assert not any(
+                        isinstance(child, (ast.Yield, ast.YieldFrom))
+                        for child in ast.walk(node)
+                    ), "{}: {} is an async generator".format(name, node.name)
@@ -0,0 +1,241 @@
+from collections import namedtuple
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase, TestCase
+
+from reports.base import ModelReport
+from reports.columns import IOColumnExecutor, io_bound, memoize
+from reports.csv_generator import CSVGenerator
+from reports.multi import MultiReportRunner
+
+from .testapp.models import ReportTestModel
+
+Row = namedtuple("Row", ["name", "country_id"])
+
+
+class MemoizeTest(SimpleTestCase):
+    def test_cached_by_key(self):
+        """
+        The column should only be computed once per distinct key
+        """
+        calls = []
+
+        @memoize(key="country_id")
+        def country(obj):
+            calls.append(obj.country_id)
+            return "Country %s" % obj.country_id
+
+        rows = [Row("a", 1), Row("b", 2), Row("c", 1), Row("d", 1)]
+        assert [country(row) for row in rows] == [
+            "Country 1",
+            "Country 2",
+            "Country 1",
+            "Country 1",
+        ]
+        assert calls == [1, 2]
+        assert country.cache_info() == {
+            "hits": 2,
+            "misses": 2,
+            "size": 2,
+            "maxsize": 1024,
+            "hit_rate": 0.5,
+        }
+
+    def test_bounded(self):
+        """
+        The least recently used value should be dropped beyond maxsize
+        """
+        column = memoize(lambda o: o.country_id, key="country_id", maxsize=2)
+        for row in [Row("a", 1), Row("b", 2), Row("c", 3), Row("d", 1)]:
+            column(row)
+        assert column.cache_info()["size"] == 2
+        assert column.cache_info()["misses"] == 4
+
+    def test_generator_metrics(self):
+        """
+        The generator should reset memoized columns and report their stats
+        """
+        column = memoize(lambda o: o.country_id, key="country_id")
+        generator = CSVGenerator(fields=[("Name", "name"), ("Country", column)])
+        generator.generate(objects=[Row("a", 1), Row("b", 1)])
+        generator.generate(objects=[Row("a", 1), Row("b", 1)])
+        assert generator.metrics["columns"]["Country"]["hits"] == 1
+
+
+class MemoizedReport(ModelReport):
+    queryset = ReportTestModel.objects.order_by("pk")
+    field_lookups = [
+        ("Name", "name"),
+        ("Initial", memoize(lambda o: o.name[0], key="name")),
+    ]
+
+
+class MemoizedReportTest(TestCase):
+    def test_cache_per_run(self):
+        """
+        Each run should use a cache of its own, dropped once data is collected
+        """
+        ReportTestModel.objects.create(name="Name")
+        ReportTestModel.objects.create(name="Name")
+        declared = MemoizedReport.field_lookups[1][1]
+
+        first, second = MemoizedReport(), MemoizedReport()
+        first_column = first.get_run_field_lookups()[1][1]
+        assert first_column is not declared
+        assert first.get_run_field_lookups()[1][1] is first_column
+        assert second.get_run_field_lookups()[1][1] is not first_column
+
+        for report in (first, second):
+            report.collect_data()
+            assert report.metrics["columns"]["Initial"]["hits"] == 1
+            assert report.metrics["columns"]["Initial"]["misses"] == 1
+            assert report._memoized_columns == {}
+        assert declared.cache_info()["misses"] == 0
+
+
+class FakeService(object):
+    """
+    Stands in for a slow remote service, recording how many calls are in
+    progress at once.
+    """
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = self.peak = 0
+        self.lock = threading.Lock()
+
+    def lookup(self, value):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if value == "slow":
+                time.sleep(1)
+            else:
+                time.sleep(self.delay)
+            return "remote %s" % value
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class IOBoundColumnTest(TestCase):
+    def test_concurrent_and_ordered(self):
+        """
+        I/O bound columns should run concurrently, within their limit, with
+        rows kept in order
+        """
+        service = FakeService()
+
+        class RemoteReport(ModelReport):
+            queryset = ReportTestModel.objects.order_by("pk")
+            io_chunk_size = 4
+            field_lookups = [
+                ("Name", "name"),
+                ("Remote", io_bound(lambda o: service.lookup(o.name), max_workers=3)),
+            ]
+
+        names = ["Name %s" % i for i in range(10)]
+        for name in names:
+            ReportTestModel.objects.create(name=name)
+
+        data = RemoteReport().collect_data()
+        assert [row["Name"] for row in data] == names
+        assert [row["Remote"] for row in data] == ["remote %s" % n for n in names]
+        assert list(data[0].keys()) == ["Name", "Remote"]
+        assert 1 < service.peak <= 3
+
+    def test_timeout(self):
+        """
+        Values taking longer than the timeout should use the default
+        """
+        service = FakeService()
+        column = io_bound(
+            lambda o: service.lookup(o.name), timeout=0.5, default="n/a"
+        )
+        with IOColumnExecutor([("Remote", column)]) as executor:
+            rows = [{}, {}]
+            executor.fill([Row("fast", 1), Row("slow", 1)], rows)
+        assert rows == [{"Remote": "remote fast"}, {"Remote": "n/a"}]
+
+    def test_hung_call_does_not_block_exit(self):
+        """
+        A call that never returns should not keep the process from exiting
+        """
+        script = (
+            "import threading\n"
+            "from reports.columns import IOColumnExecutor, io_bound\n"
+            "column = io_bound(lambda o: threading.Event().wait(), timeout=0.1)\n"
+            "with IOColumnExecutor([('Remote', column)]) as executor:\n"
+            "    rows = [{}]\n"
+            "    executor.fill([None], rows)\n"
+            "print(rows)\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stdout=subprocess.PIPE,
+            timeout=30,
+        )
+        assert result.stdout == b"[{'Remote': ''}]\n"
+
+    def test_async_off_event_loop(self):
+        """
+        The async path should evaluate I/O bound columns in a worker thread
+        """
+        threads = []
+
+        def lookup(obj):
+            threads.append(threading.get_ident())
+            return "remote %s" % obj.name
+
+        class RemoteReport(ModelReport):
+            queryset = ReportTestModel.objects.order_by("pk")
+            field_lookups = [("Name", "name"), ("Remote", io_bound(lookup))]
+
+        ReportTestModel.objects.create(name="Name 1")
+
+        async def collect():
+            loop_thread = threading.get_ident()
+            data = await RemoteReport().acollect_data()
+            return loop_thread, data
+
+        loop_thread, data = async_to_sync(collect)()
+        assert [row["Remote"] for row in data] == ["remote Name 1"]
+        assert threads and loop_thread not in threads
+
+    def test_shared_scan(self):
+        """
+        A shared scan should evaluate I/O bound columns concurrently too
+        """
+        service = FakeService()
+
+        class RemoteReport(ModelReport):
+            io_chunk_size = 4
+            field_lookups = [
+                ("Name", "name"),
+                ("Remote", io_bound(lambda o: service.lookup(o.name), max_workers=3)),
+            ]
+
+        class NameReport(ModelReport):
+            field_lookups = [("Name", "name")]
+
+        names = ["Name %s" % i for i in range(6)]
+        for name in names:
+            ReportTestModel.objects.create(name=name)
+
+        runner = MultiReportRunner(
+            [RemoteReport, NameReport], queryset=ReportTestModel.objects.order_by("pk")
+        )
+        runner.collect()
+        remote, plain = runner.reports
+        assert [row["Remote"] for row in remote.data] == [
+            "remote %s" % name for name in names
+        ]
+        assert [row["Name"] for row in plain.data] == names
+        assert 1 < service.peak <= 3
@@ -0,0 +1,193 @@
+from datetime import timedelta
+import io
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from reports.base import ModelReport, reports
+from reports.models import SavedReport
+
+from .mixins import SavedReportMixin
+from .testapp.models import ReportTestModel
+
+
+class CommandReport(ModelReport):
+    name = "Command Report"
+
+
+class RunReportCommandTest(SavedReportMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        reports.register(ReportTestModel, CommandReport)
+        self.addCleanup(reports._models.pop, ReportTestModel)
+
+        self.first = ReportTestModel.objects.create(name="Name 1")
+        self.second = ReportTestModel.objects.create(name="Name 2")
+
+    def test_stdout(self):
+        """
+        Should write the filtered report to stdout
+        """
+        stdout = io.StringIO()
+        call_command(
+            "runreport",
+            "Command Report",
+            "--filter=name=Name 2",
+            "--output=-",
+            stdout=stdout,
+        )
+        assert stdout.getvalue() == "Id,Name\r\n%s,Name 2\r\n" % self.second.pk
+
+    def test_saved_report(self):
+        """
+        Should save a report for each report registered against the model
+        """
+        call_command(
+            "runreport",
+            "--model=testapp.ReportTestModel",
+            "--pk-range=:%s" % self.first.pk,
+            stderr=io.StringIO(),
+        )
+        saved = SavedReport.objects.get()
+        assert saved.report == "Command Report"
+        assert saved.rows_processed == 1
+
+    def test_unknown_report(self):
+        with self.assertRaises(CommandError):
+            call_command("runreport", "Missing Report")
+
+
+class UpperReport(ModelReport):
+    name = "Upper Report"
+    field_lookups = [("Upper", lambda o: o.name.upper())]
+
+
+class UserReport(ModelReport):
+    name = "User Report"
+    field_lookups = [("Username", "username")]
+
+
+class RunReportWorkersTest(SavedReportMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        reports.register(ReportTestModel, CommandReport)
+        reports.register(ReportTestModel, UpperReport)
+        reports.register(User, UserReport)
+        self.addCleanup(reports._models.pop, ReportTestModel)
+        self.addCleanup(reports._models.pop, User)
+        self.output = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output)
+
+        self.first = ReportTestModel.objects.create(name="Name 1")
+        User.objects.create(username="reporter")
+
+    def test_workers_output_directory(self):
+        """
+        Reports of different models should run in parallel, each written to
+        its own file within the output directory
+        """
+        call_command(
+            "runreport",
+            "Command Report",
+            "Upper Report",
+            "User Report",
+            "--workers=2",
+            "--output=%s" % self.output,
+            stderr=io.StringIO(),
+        )
+
+        contents = {}
+        for filename in os.listdir(self.output):
+            with open(os.path.join(self.output, filename), newline="") as f:
+                contents[filename.split("-report-", 1)[0]] = f.read()
+        assert contents == {
+            "command": "Id,Name\r\n%s,Name 1\r\n" % self.first.pk,
+            "upper": "Upper\r\nNAME 1\r\n",
+            "user": "Username\r\nreporter\r\n",
+        }
+
+    def test_workers_saved_reports(self):
+        """
+        Reports run by several workers should each save a SavedReport
+        """
+        call_command(
+            "runreport",
+            "Command Report",
+            "User Report",
+            "--workers=2",
+            stderr=io.StringIO(),
+        )
+        assert sorted(SavedReport.objects.values_list("report", flat=True)) == [
+            "Command Report",
+            "User Report",
+        ]
+
+    def test_output_must_be_directory(self):
+        with self.assertRaises(CommandError):
+            call_command(
+                "runreport",
+                "Command Report",
+                "User Report",
+                "--output=%s" % os.path.join(self.output, "report.csv"),
+            )
+
+
+class PurgeReportsCommandTest(SavedReportMixin, TestCase):
+    def create(self, name, days_old=0, content="x"):
+        saved = SavedReport.objects.create(report=name)
+        saved.save_file(content, "%s.csv" % name)
+        SavedReport.objects.filter(pk=saved.pk).update(
+            date_created=timezone.now() - timedelta(days=days_old)
+        )
+        return saved
+
+    def purge(self, *args):
+        stdout = io.StringIO()
+        call_command("purgereports", *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_max_age(self):
+        old = self.create("Old", days_old=10)
+        new = self.create("New", days_old=1)
+        storage = old.report_file.storage
+
+        assert self.purge("--max-age=5", "--dry-run") == "Would delete 1 saved reports\n"
+        assert SavedReport.objects.count() == 2
+
+        assert self.purge("--max-age=5") == "Deleted 1 saved reports\n"
+        assert list(SavedReport.objects.all()) == [new]
+        assert not storage.exists(old.report_file.name)
+        assert storage.exists(new.report_file.name)
+
+    def test_max_count(self):
+        self.create("Report", days_old=3)
+        self.create("Report", days_old=2)
+        newest = self.create("Report", days_old=1)
+        other = self.create("Other", days_old=3)
+
+        self.purge("--max-count=1")
+        assert set(SavedReport.objects.all()) == {newest, other}
+
+    def test_max_bytes(self):
+        self.create("Old", days_old=2, content="x" * 10)
+        new = self.create("New", days_old=1, content="x" * 10)
+
+        self.purge("--max-bytes=15")
+        assert list(SavedReport.objects.all()) == [new]
+
+    def test_stale_age(self):
+        done = self.create("Done", days_old=2)
+        running = SavedReport.objects.create(report="Running")
+        stale = SavedReport.objects.create(report="Stale")
+        SavedReport.objects.filter(pk=stale.pk).update(
+            date_created=timezone.now() - timedelta(hours=3)
+        )
+
+        self.purge("--stale-age=2")
+        assert set(SavedReport.objects.all()) == {done, running}
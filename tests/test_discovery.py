@@ -0,0 +1,85 @@
+import sys
+from unittest import mock
+
+from django.apps import apps
+from django.contrib import admin
+from django.test import RequestFactory, TestCase
+
+from reports.base import Reports
+
+from .testapp.models import ReportTestModel
+
+LAZY_MODULE = "tests.testapp.lazy_report"
+
+
+class LazyDiscoveryTest(TestCase):
+    def setUp(self):
+        sys.modules.pop(LAZY_MODULE, None)
+        self.addCleanup(sys.modules.pop, LAZY_MODULE, None)
+
+        class ReportTestModelAdmin(admin.ModelAdmin):
+            pass
+
+        self.site = admin.AdminSite(name="lazy")
+        self.site.register(ReportTestModel, ReportTestModelAdmin)
+        self.model_admin = self.site._registry[ReportTestModel]
+
+        settings = self.settings(
+            REPORTS_MANIFEST={
+                "testapp.ReportTestModel": ["%s.LazyReport" % LAZY_MODULE],
+            }
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def get_action_names(self):
+        request = RequestFactory().get("/")
+        request.user = type("User", (), {"has_perm": lambda *args: True})()
+        return list(self.model_admin.get_actions(request))
+
+    def test_reports_imported_on_first_use(self):
+        """
+        Reports listed in the manifest should only be imported once the
+        model's admin asks for its actions
+        """
+        reports = Reports()
+        reports.discover(site=self.site)
+        assert LAZY_MODULE not in sys.modules
+
+        assert "Lazy Report" in self.get_action_names()
+        assert LAZY_MODULE in sys.modules
+        # Actions are only added once
+        self.get_action_names()
+        assert len(self.model_admin.__class__.actions) == 1
+
+    def test_command_lookup(self):
+        """
+        Looking reports up by model should import them
+        """
+        reports = Reports()
+        reports.discover(site=self.site)
+        [(model, report)] = reports.get_reports(model=ReportTestModel)
+        assert model is ReportTestModel
+        assert report.name == "Lazy Report"
+
+    def test_discover_large_manifest(self):
+        """
+        Guards against regressions in startup time: discovering a large
+        manifest should import nothing, and look each model up only once
+        """
+        manifest = {
+            "testapp.ReportTestModel": [
+                "%s.LazyReport" % LAZY_MODULE for i in range(500)
+            ],
+        }
+        with self.settings(REPORTS_MANIFEST=manifest):
+            reports = Reports()
+            get_model = mock.patch.object(apps, "get_model", wraps=apps.get_model)
+            with mock.patch("reports.base.import_string") as import_string:
+                with get_model as get_model:
+                    reports.discover(site=self.site)
+
+        assert LAZY_MODULE not in sys.modules
+        assert not import_string.called
+        assert get_model.call_count == 1
+        assert len(reports._lazy[ReportTestModel]) == 500
@@ -1,8 +1,15 @@
 from collections import OrderedDict
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import QuerySet
 from django.test import TestCase
 
-from reports.base import ModelReport
+from reports.base import ModelReport, XMLModelReport
+from reports.models import SavedReport
+from reports.progress import ProgressTracker
 
+from .mixins import SavedReportMixin
 from .testapp.models import ReportTestModel
 
 
@@ -33,3 +40,272 @@ class ModelReportTest(TestCase):
                 ]
             ),
         ]
+
+    def test_custom_row_data(self):
+        """
+        The header should come from the rows of an overridden get_row_data,
+        not the model's fields
+        """
+
+        class LabelReport(ModelReport):
+            queryset = ReportTestModel.objects.all()
+
+            def get_row_data(self, obj):
+                return OrderedDict([("Label", obj.name.lower())])
+
+        ReportTestModel.objects.create(name="A")
+
+        report = LabelReport()
+        report.collect_data()
+        assert report.as_csv() == "Label\r\na\r\n"
+
+
+class IncrementalReportTest(SavedReportMixin, TestCase):
+    def test_delta(self):
+        """
+        Each run should only contain rows past the previous run's watermark
+        """
+
+        class DeltaReport(ModelReport):
+            name = "Delta"
+            queryset = ReportTestModel.objects.all()
+            incremental_field = "pk"
+
+        first = ReportTestModel.objects.create(name="Name 1")
+        saved = DeltaReport().run_report()
+        assert saved.watermark == str(first.pk)
+        assert self.read(saved) == "Id,Name\r\n%s,Name 1\r\n" % first.pk
+
+        second = ReportTestModel.objects.create(name="Name 2")
+        saved = DeltaReport().run_report()
+        assert saved.watermark == str(second.pk)
+        assert self.read(saved) == "Id,Name\r\n%s,Name 2\r\n" % second.pk
+
+        # Nothing new; the watermark carries over
+        saved = DeltaReport().run_report()
+        assert saved.watermark == str(second.pk)
+
+    def test_merged(self):
+        """
+        A merged run should append new rows to the previous output
+        """
+
+        class MergedReport(ModelReport):
+            name = "Merged"
+            queryset = ReportTestModel.objects.all()
+            incremental_field = "pk"
+            incremental_output = "merged"
+
+        first = ReportTestModel.objects.create(name="Name 1")
+        MergedReport().run_report()
+        second = ReportTestModel.objects.create(name="Name 2")
+        saved = MergedReport().run_report()
+        assert self.read(saved) == "Id,Name\r\n%s,Name 1\r\n%s,Name 2\r\n" % (
+            first.pk,
+            second.pk,
+        )
+
+    def test_watermark_per_report_class(self):
+        """
+        Reports sharing the default name should keep watermarks of their own
+        """
+
+        class FirstReport(ModelReport):
+            queryset = ReportTestModel.objects.all()
+            incremental_field = "pk"
+
+        class SecondReport(FirstReport):
+            pass
+
+        obj = ReportTestModel.objects.create(name="Name 1")
+        saved = FirstReport().run_report()
+        assert ".FirstReport:testapp.reporttestmodel:" in saved.watermark_key
+
+        # The first run of another report still covers every row
+        saved = SecondReport().run_report()
+        assert self.read(saved) == "Id,Name\r\n%s,Name 1\r\n" % obj.pk
+
+    def test_watermark_per_selection(self):
+        """
+        A run over a narrower selection should not advance the watermark of
+        runs over the whole queryset
+        """
+
+        class NightlyReport(ModelReport):
+            queryset = ReportTestModel.objects.all()
+            incremental_field = "pk"
+
+        ReportTestModel.objects.create(name="Name 1")
+        NightlyReport().run_report()
+        objs = [
+            ReportTestModel.objects.create(name="Name %s" % i) for i in range(2, 6)
+        ]
+
+        # e.g. an admin action on the newest row alone
+        selected = ReportTestModel.objects.filter(pk=objs[-1].pk)
+        saved = NightlyReport(queryset=selected).run_report()
+        assert saved.watermark == str(objs[-1].pk)
+
+        saved = NightlyReport().run_report()
+        assert saved.watermark == str(objs[-1].pk)
+        assert self.read(saved) == "Id,Name\r\n" + "".join(
+            "%s,%s\r\n" % (obj.pk, obj.name) for obj in objs
+        )
+
+    def test_merged_requires_csv(self):
+        """
+        Merging should be refused for output other than CSV
+        """
+
+        class MergedXMLReport(XMLModelReport):
+            queryset = ReportTestModel.objects.all()
+            incremental_field = "pk"
+            incremental_output = "merged"
+
+        with self.assertRaises(ImproperlyConfigured):
+            MergedXMLReport()
+
+
+class ProgressTest(SavedReportMixin, TestCase):
+    def test_tracker_flushes_in_batches(self):
+        """
+        Progress should be written once per batch when the interval has passed
+        """
+        saved = SavedReport.objects.create(report="Progress")
+        tracker = ProgressTracker(saved, total=5, interval=0, batch=2)
+
+        seen = []
+        for i in tracker.track(range(5)):
+            seen.append(i)
+            if i == 2:
+                # Two batches of two rows have been flushed
+                saved.refresh_from_db()
+                assert saved.rows_processed == 2
+
+        assert seen == list(range(5))
+        assert tracker.rows == 5
+        saved.refresh_from_db()
+        assert saved.rows_processed == 4
+        assert saved.rows_total == 5
+        assert saved.rows_per_second is not None
+        assert saved.get_progress() == 0.8
+
+    def test_run_report_records_progress(self):
+        """
+        A completed run should record the rows it processed
+        """
+
+        class FooReport(ModelReport):
+            queryset = ReportTestModel.objects.all()
+            progress_estimate = "count"
+
+        ReportTestModel.objects.create(name="Name 1")
+        ReportTestModel.objects.create(name="Name 2")
+
+        saved = FooReport().run_report()
+
+        assert saved.rows_processed == 2
+        assert saved.rows_total == 2
+        assert saved.date_completed is not None
+        assert saved.get_progress() == 1.0
+        assert saved.get_eta() is None
+
+    def test_no_estimate_by_default(self):
+        """
+        The total should not be estimated, with an extra query, unless asked
+        """
+
+        class FooReport(ModelReport):
+            queryset = ReportTestModel.objects.all()
+
+        ReportTestModel.objects.create(name="Name 1")
+
+        with mock.patch.object(QuerySet, "count") as count:
+            saved = FooReport().run_report()
+
+        count.assert_not_called()
+        assert saved.rows_processed == 1
+        assert saved.rows_total is None
+
+    def test_overridden_save(self):
+        """
+        Reports overriding `save` should not leave an empty SavedReport behind
+        """
+
+        class DownloadReport(ModelReport):
+            queryset = ReportTestModel.objects.all()
+
+            def save(self, output):
+                self.output = output
+
+        obj = ReportTestModel.objects.create(name="Name 1")
+        report = DownloadReport()
+        report.run_report()
+
+        assert report.output == "Id,Name\r\n%s,Name 1\r\n" % obj.pk
+        assert not SavedReport.objects.exists()
+
+
+class SavedReportTest(SavedReportMixin, TestCase):
+    def test_save_file_details(self):
+        """
+        Saving the file should record its size, type and checksum
+        """
+        saved = SavedReport.objects.create(report="Details")
+        saved.save_file("Id,Name\r\n1,Name 1\r\n", "details.csv")
+        saved.refresh_from_db()
+
+        assert saved.file_size == 19
+        assert saved.content_type == "text/csv"
+        assert saved.checksum == (
+            "c9b141bfa7647475d286373dc96a7132bcd8c09e55652ed162ac29d87d2ce4a6"
+        )
+
+
+class SchemaTest(TestCase):
+    def test_data_fields(self):
+        """
+        Heterogeneous rows should give every key, in the order first seen
+        """
+
+        class CustomReport(ModelReport):
+            queryset = ReportTestModel.objects.all()
+
+            def collect_data(self):
+                self.reset_data()
+                self.add_row(OrderedDict([("A", 1), ("B", 2)]))
+                self.add_row(OrderedDict([("C", 3), ("A", 4)]))
+                return self.data
+
+        report = CustomReport()
+        report.collect_data()
+        assert list(report.schema) == ["A", "B", "C"]
+        assert report.get_fields() == ["A", "B", "C"]
+        assert report.as_csv() == "A,B,C\r\n1,2,\r\n4,,3\r\n"
+
+        # Data assigned directly is analysed on demand
+        report = CustomReport()
+        report.data = [{"X": 1}, {"Y": 2, "X": 3}]
+        assert report.get_fields() == ["X", "Y"]
+
+    def test_stream_sample(self):
+        """
+        The streamed header should be inferred from the sampled rows
+        """
+
+        class SampledReport(ModelReport):
+            queryset = ReportTestModel.objects.order_by("pk")
+            schema_sample_size = 2
+
+            def get_row_data(self, obj):
+                return OrderedDict([("Label", obj.name.lower())])
+
+        for i in range(3):
+            ReportTestModel.objects.create(name="Name %s" % i)
+
+        assert list(SampledReport().stream_csv()) == [
+            "Label\r\n",
+            "name 0\r\n",
+            "name 1\r\n",
+            "name 2\r\n",
+        ]
@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from reports.base import ModelReport
+from reports.models import SavedReport
+from reports.multi import MultiReportRunner
+
+from .mixins import SavedReportMixin
+from .testapp.models import ReportTestModel
+
+
+class NameReport(ModelReport):
+    name = "Names"
+    field_lookups = [("Name", "name")]
+
+
+class UpperReport(ModelReport):
+    name = "Upper"
+    field_lookups = [("Upper", lambda o: o.name.upper())]
+
+
+class MultiReportRunnerTest(SavedReportMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        ReportTestModel.objects.create(name="Name 1")
+        ReportTestModel.objects.create(name="Name 2")
+
+    def test_single_scan(self):
+        """
+        Should produce a SavedReport per report from one query
+        """
+        runner = MultiReportRunner(
+            [NameReport, UpperReport], queryset=ReportTestModel.objects.all()
+        )
+        with self.assertNumQueries(1):
+            runner.collect_data(runner.reports)
+
+        names, upper = runner.run()
+        assert names.report == "Names"
+        assert self.read(names) == "Name\r\nName 1\r\nName 2\r\n"
+        assert upper.report == "Upper"
+        assert self.read(upper) == "Upper\r\nNAME 1\r\nNAME 2\r\n"
+
+    def test_different_selections(self):
+        """
+        Rows should only reach the reports which selected them
+        """
+
+        class FirstReport(NameReport):
+            queryset = ReportTestModel.objects.filter(name="Name 1")
+
+        class SecondReport(UpperReport):
+            queryset = ReportTestModel.objects.filter(name="Name 2")
+
+        first, second = MultiReportRunner([FirstReport, SecondReport]).run()
+        assert self.read(first) == "Name\r\nName 1\r\n"
+        assert self.read(second) == "Upper\r\nNAME 2\r\n"
+
+    def test_progress(self):
+        """
+        The progress of the shared scan should be recorded on every report
+        """
+        runner = MultiReportRunner(
+            [NameReport, UpperReport], queryset=ReportTestModel.objects.all()
+        )
+        for report in runner.reports:
+            report.progress_estimate = "count"
+            report.start_saved_report()
+        with mock.patch("reports.progress.REPORTS_PROGRESS_BATCH", 1):
+            with mock.patch("reports.progress.REPORTS_PROGRESS_INTERVAL", 0):
+                rows = runner.track_progress(
+                    ReportTestModel.objects.all(), runner.reports
+                )
+                # The first row is flushed when the second is fetched
+                next(rows)
+                next(rows)
+
+        for report in runner.reports:
+            saved = SavedReport.objects.get(pk=report.saved_report.pk)
+            assert saved.rows_processed == 1
+            assert saved.rows_total == 2
+
+    def test_run_single_flight(self):
+        """
+        Runs of the same reports should coalesce, unless one of them opts out
+        """
+        queryset = ReportTestModel.objects.all()
+        runner = MultiReportRunner([NameReport, UpperReport], queryset=queryset)
+        key = runner.get_single_flight_key()
+        assert key is not None
+        other = MultiReportRunner([UpperReport, NameReport], queryset=queryset)
+        assert other.get_single_flight_key() != key
+
+        class UncoalescedReport(UpperReport):
+            single_flight = False
+
+        other = MultiReportRunner([NameReport, UncoalescedReport], queryset=queryset)
+        assert other.get_single_flight_key() is None
+
+        names, upper = runner.run_single_flight()
+        assert SavedReport.objects.count() == 2
+        assert names.rows_processed == upper.rows_processed == 2
@@ -0,0 +1,99 @@
+import pstats
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase
+
+from reports.base import ModelReport, Reports
+
+from .mixins import SavedReportMixin
+from .testapp.models import ReportTestModel
+
+
+class ProfiledReport(ModelReport):
+    name = "Profiled"
+    queryset = ReportTestModel.objects.all()
+    profile = True
+    single_flight = False
+
+
+class ProfilingTest(SavedReportMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+
+        ReportTestModel.objects.create(name="Name 1")
+
+    def test_cprofile(self):
+        """
+        The pstats file and summary should be attached to the SavedReport
+        """
+        saved = ProfiledReport().run_single_flight()
+
+        assert saved.profile_file.name.endswith(".pstats")
+        stats = pstats.Stats(saved.profile_file.path)
+        assert any(name == "get_row_data" for _, _, name in stats.stats)
+        assert "run_report" in saved.profile_summary
+
+    def test_sampling(self):
+        """
+        A sampling profile should only attach a summary
+        """
+
+        class SampledReport(ProfiledReport):
+            profile_mode = "sampling"
+
+        saved = SampledReport().run_single_flight()
+        assert not saved.profile_file
+        assert "samples" in saved.profile_summary
+
+    def test_unprofiled(self):
+        """
+        Reports should not be profiled by default
+        """
+
+        class PlainReport(ProfiledReport):
+            profile = None
+
+        saved = PlainReport().run_single_flight()
+        assert not saved.profile_file
+        assert saved.profile_summary == ""
+
+    def test_profile_action_requires_superuser(self):
+        """
+        Only superusers may run the profiling copy of a report action
+        """
+        report = ProfiledReport(profile=True, profile_action=True)
+        assert report.short_description == "Profiled (profile)"
+
+        model_admin = mock.Mock()
+        request = mock.Mock()
+        request.user.is_superuser = False
+        assert report(model_admin, request, ReportTestModel.objects.all()) is False
+        assert model_admin.message_user.called
+
+    def test_profile_action_hidden(self):
+        """
+        The profiling copy of a report action should only be offered to
+        superusers
+        """
+
+        class ReportTestModelAdmin(admin.ModelAdmin):
+            pass
+
+        site = admin.AdminSite(name="profiling")
+        site.register(ReportTestModel, ReportTestModelAdmin)
+        model_admin = site._registry[ReportTestModel]
+
+        with mock.patch("reports.base.REPORTS_PROFILE_ACTIONS", True):
+            registry = Reports()
+            registry.register(ReportTestModel, ProfiledReport)
+            registry._add_actions(site)
+
+        request = RequestFactory().get("/")
+        request.user = User.objects.create_user("staff", is_staff=True)
+        assert "Profiled" in model_admin.get_actions(request)
+        assert "Profiled (profile)" not in model_admin.get_actions(request)
+
+        request.user = User.objects.create_superuser("admin", "admin@example.com", "pw")
+        assert "Profiled (profile)" in model_admin.get_actions(request)
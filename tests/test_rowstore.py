@@ -0,0 +1,119 @@
+from collections import OrderedDict
+import random
+
+from django.test import SimpleTestCase, TestCase
+
+from reports.base import ModelReport
+from reports.rowstore import RowStore
+
+from .testapp.models import ReportTestModel
+
+
+class RowStoreTest(SimpleTestCase):
+    def make_rows(self, count):
+        return [OrderedDict([("Id", i), ("Name", "Name %s" % i)]) for i in range(count)]
+
+    def test_spills_to_disk(self):
+        """
+        Rows beyond the budget should be spilled, and still iterate in order
+        """
+        store = RowStore(memory_budget=2048)
+        store.block_size = 7
+        rows = self.make_rows(100)
+        store.extend(rows)
+
+        assert store._runs
+        assert len(store) == 100
+        assert list(store) == rows
+        store.close()
+
+    def test_heterogeneous_rows(self):
+        """
+        Rows with differing keys should come back with their own keys only
+        """
+        store = RowStore(memory_budget=0)
+        store.append(OrderedDict([("A", 1)]))
+        store.append(OrderedDict([("B", 2), ("A", None)]))
+        assert list(store.columns) == ["A", "B"]
+        assert list(store) == [{"A": 1}, {"A": None, "B": 2}]
+
+    def test_external_sort(self):
+        """
+        Spilled rows should be sorted across runs
+        """
+        store = RowStore(memory_budget=4096)
+        store.block_size = 5
+        rows = self.make_rows(200)
+        shuffled = rows[:]
+        random.Random(1).shuffle(shuffled)
+        store.extend(shuffled)
+        assert len(store._runs) > 1
+
+        store.sort(key=lambda row: row["Id"])
+        assert list(store) == rows
+
+        store.sort(key=lambda row: row["Id"], reverse=True)
+        assert list(store) == rows[::-1]
+
+    def test_repeated_sort_within_budget(self):
+        """
+        Sorting again once spilled should still hold at most a budget's worth
+        of rows in memory at a time
+        """
+        held = []
+
+        class RecordingStore(RowStore):
+            def _spill(self):
+                held.append(len(self._rows))
+                super()._spill()
+
+            def _sort_rows(self, rows, tuple_key, reverse):
+                held.append(len(rows))
+                super()._sort_rows(rows, tuple_key, reverse)
+
+        store = RecordingStore(memory_budget=4096)
+        store.block_size = 5
+        rows = self.make_rows(2000)
+        shuffled = rows[:]
+        random.Random(1).shuffle(shuffled)
+        store.extend(shuffled)
+        budget_rows = max(held)
+
+        store.sort(key=lambda row: row["Id"], reverse=True)
+        store.sort(key=lambda row: row["Id"])
+        assert list(store) == rows
+        assert max(held) <= budget_rows
+        store.close()
+
+    def test_sort_without_key(self):
+        """
+        Without a key, rows should be compared themselves, as by list.sort
+        """
+        store = RowStore(memory_budget=0)
+        store.append(OrderedDict([("Id", 1)]))
+        store.sort()
+        assert list(store) == [{"Id": 1}]
+
+        store.append(OrderedDict([("Id", 2)]))
+        with self.assertRaises(TypeError):
+            store.sort()
+
+
+class BudgetedReportTest(TestCase):
+    def test_collect_data(self):
+        """
+        A report with a memory budget should collect into a RowStore
+        """
+
+        class BudgetedReport(ModelReport):
+            queryset = ReportTestModel.objects.all()
+            data_memory_budget = 0
+
+        ReportTestModel.objects.create(name="Name 1")
+        ReportTestModel.objects.create(name="Name 2")
+
+        report = BudgetedReport()
+        data = report.collect_data()
+        assert isinstance(data, RowStore)
+        assert len(data) == 2
+        assert report.as_csv() == "Id,Name\r\n1,Name 1\r\n2,Name 2\r\n"
@@ -0,0 +1,187 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase
+
+from reports.base import ModelReport
+from reports.models import SavedReport
+from reports.singleflight import KEY_PREFIX, SingleFlightTimeout, single_flight
+
+from .mixins import SavedReportMixin
+from .testapp.models import ReportTestModel
+
+
+def signal_polling(polling, followers=1):
+    """
+    Patch `time.sleep`, which single_flight calls between polls, to set the
+    `polling` event once `followers` threads are waiting on a run
+    """
+    sleep = time.sleep
+    threads = set()
+
+    def poll(seconds):
+        threads.add(threading.get_ident())
+        if len(threads) >= followers:
+            polling.set()
+        sleep(seconds)
+
+    return mock.patch("reports.singleflight.time.sleep", side_effect=poll)
+
+
+class SingleFlightTest(SimpleTestCase):
+    lock_key = "%s:lock:key" % KEY_PREFIX
+
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_calls_are_coalesced(self):
+        """
+        Concurrent calls with the same key should run the work once and all
+        receive its result
+        """
+        calls = []
+        started = threading.Event()
+        polling = threading.Event()
+
+        def work():
+            calls.append(1)
+            started.set()
+            # Stay in flight until every follower has attached
+            polling.wait(10)
+            return 42
+
+        results = []
+
+        def call():
+            results.append(single_flight("key", work, poll_interval=0.01))
+
+        with signal_polling(polling, followers=4):
+            leader = threading.Thread(target=call)
+            leader.start()
+            started.wait()
+            followers = [threading.Thread(target=call) for _ in range(4)]
+            for t in followers:
+                t.start()
+            for t in [leader] + followers:
+                t.join()
+
+        assert len(calls) == 1
+        assert results == [42] * 5
+
+    def test_sequential_calls_run_again(self):
+        """
+        Once a run has finished, a new call should not reuse its result
+        """
+        calls = []
+
+        def work():
+            calls.append(1)
+            return len(calls)
+
+        assert single_flight("key", work) == 1
+        assert single_flight("key", work) == 2
+
+    def test_release_own_lock_only(self):
+        """
+        A leader whose lock expired and was taken by another run should leave
+        that run's lock in place
+        """
+
+        def work():
+            # The lock expires and another leader takes it
+            cache.set(self.lock_key, "other")
+            return 42
+
+        assert single_flight("key", work) == 42
+        assert cache.get(self.lock_key) == "other"
+
+    def test_wait(self):
+        """
+        A follower should give up after `wait`, regardless of the lock timeout
+        """
+        cache.add(self.lock_key, "other", 3600)
+        work = mock.Mock()
+        with self.assertRaises(SingleFlightTimeout):
+            single_flight("key", work, timeout=3600, wait=0.05, poll_interval=0.01)
+        work.assert_not_called()
+
+    def test_process_local_cache_warning(self):
+        """
+        Should warn, once, that a LocMemCache only coalesces within a process
+        """
+        with mock.patch("reports.singleflight._warned", set()):
+            with self.assertLogs("reports.singleflight", "WARNING") as logs:
+                single_flight("key", lambda: 1)
+                single_flight("key", lambda: 2)
+        assert len(logs.output) == 1
+        assert "LocMemCache" in logs.output[0]
+
+
+class ScanCountingReport(ModelReport):
+    name = "Single Flight"
+    queryset = ReportTestModel.objects.all()
+
+    scans = []
+    scanning = threading.Event()
+    polling = threading.Event()
+
+    def collect_data(self):
+        self.scans.append(self)
+        self.scanning.set()
+        # Keep the run in flight until the second caller has attached to it
+        self.polling.wait(10)
+        return super().collect_data()
+
+
+class ModelReportSingleFlightTest(SavedReportMixin, TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        ScanCountingReport.scans = []
+        ScanCountingReport.scanning = threading.Event()
+        ScanCountingReport.polling = threading.Event()
+        self.obj = ReportTestModel.objects.create(name="Name 1")
+
+    def test_key(self):
+        """
+        Identical runs should share a key, which differs by user and query
+        """
+        key = ScanCountingReport().get_single_flight_key()
+        assert ScanCountingReport().get_single_flight_key() == key
+        assert ScanCountingReport(user_id=1).get_single_flight_key() != key
+        queryset = ReportTestModel.objects.filter(pk=self.obj.pk)
+        assert ScanCountingReport(queryset=queryset).get_single_flight_key() != key
+
+    def test_identical_runs_are_coalesced(self):
+        """
+        A run started while an identical one is in flight should receive the
+        SavedReport of that run, without scanning the database again
+        """
+        results = {}
+
+        def run(name):
+            try:
+                results[name] = ScanCountingReport().run_single_flight()
+            finally:
+                connections.close_all()
+
+        poll_interval = "reports.singleflight.REPORTS_SINGLE_FLIGHT_POLL_INTERVAL"
+        with mock.patch(poll_interval, 0.01), signal_polling(
+            ScanCountingReport.polling
+        ):
+            leader = threading.Thread(target=run, args=("leader",))
+            leader.start()
+            ScanCountingReport.scanning.wait()
+            follower = threading.Thread(target=run, args=("follower",))
+            follower.start()
+            leader.join()
+            follower.join()
+
+        assert len(ScanCountingReport.scans) == 1
+        assert results["leader"].pk == results["follower"].pk
+        assert SavedReport.objects.count() == 1
+        expected = "Id,Name\r\n%s,Name 1\r\n" % self.obj.pk
+        assert self.read(results["follower"]) == expected
@@ -0,0 +1,9 @@
+from reports.base import ModelReport
+
+
+class LazyReport(ModelReport):
+    """
+    Only imported through the manifest of the lazy discovery tests.
+    """
+
+    name = "Lazy Report"